@@ -1,12 +1,14 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core.responses import FastJSONResponse
 from app.routers import analytics, health
 
 app = FastAPI(
     title="Analytics Service",
     description="Anonymous analytics and metrics collection service",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(
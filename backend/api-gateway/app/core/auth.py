@@ -0,0 +1,50 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Optional
+
+from jose import JWTError, jwt
+
+from app.core.config import settings
+
+INTERNAL_IDENTITY_HEADER = "X-Internal-Identity"
+
+
+def edge_auth_enabled() -> bool:
+    return bool(settings.EDGE_AUTH_ENABLED and settings.JWT_SECRET_KEY and settings.INTERNAL_AUTH_SECRET)
+
+
+def decode_access_token(token: str) -> Optional[dict]:
+    """Verify an access token locally with the key shared with auth-service"""
+    try:
+        payload = jwt.decode(
+            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+        )
+    except JWTError:
+        return None
+    if payload.get("type") != "access" or not payload.get("sub"):
+        return None
+    return payload
+
+
+def sign_identity(claims: dict) -> str:
+    """Build the signed identity header value trusted by downstream services.
+
+    Format: base64url(JSON identity) + "." + hex HMAC-SHA256 over the encoded
+    part. The identity expires together with the access token it came from.
+    """
+    identity = {
+        "id": int(claims["sub"]),
+        "email": claims.get("email"),
+        "exp": int(claims["exp"]),
+        "iat": int(time.time()),
+    }
+    encoded = base64.urlsafe_b64encode(
+        json.dumps(identity, separators=(",", ":")).encode()
+    ).decode().rstrip("=")
+    signature = hmac.new(
+        settings.INTERNAL_AUTH_SECRET.encode(), encoded.encode(), hashlib.sha256
+    ).hexdigest()
+    return f"{encoded}.{signature}"
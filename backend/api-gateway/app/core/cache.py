@@ -0,0 +1,184 @@
+import base64
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "gw:cache:"
+
+
+class CachedResponse:
+    """A fully read upstream response, as kept by the gateway cache"""
+
+    def __init__(self, status_code: int, headers: Dict[str, str], body: bytes, etag: Optional[str] = None):
+        self.status_code = status_code
+        self.headers = headers
+        self.body = body
+        self._etag = etag
+
+    @property
+    def etag(self) -> str:
+        if self._etag is None:
+            self._etag = '"' + hashlib.sha1(self.body).hexdigest() + '"'
+        return self._etag
+
+    def to_json(self) -> str:
+        return json.dumps({
+            "status_code": self.status_code,
+            "headers": self.headers,
+            "body": base64.b64encode(self.body).decode(),
+            "etag": self.etag,
+        })
+
+    @classmethod
+    def from_json(cls, raw: str) -> "CachedResponse":
+        data = json.loads(raw)
+        return cls(
+            status_code=data["status_code"],
+            headers=data["headers"],
+            body=base64.b64decode(data["body"]),
+            etag=data["etag"],
+        )
+
+
+class MemoryCacheStore:
+    """In-process store with TTL expiry and LRU eviction"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, tuple[float, CachedResponse]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        item = self._entries.get(key)
+        if item is None:
+            return None
+        expires_at, entry = item
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: CachedResponse, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, entry)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def invalidate(self, prefix: str):
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+
+    async def close(self):
+        self._entries.clear()
+
+
+class RedisCacheStore:
+    """Redis-backed store shared by all gateway replicas.
+
+    Entries expire through the key TTL; LRU eviction is left to the Redis
+    maxmemory policy.
+    """
+
+    def __init__(self):
+        self.redis_client: Optional["redis.Redis"] = None
+
+    async def connect(self):
+        """Connect to Redis"""
+        try:
+            self.redis_client = await redis.from_url(settings.REDIS_URL, decode_responses=True)
+        except Exception as e:
+            logger.error(f"Failed to connect to Redis: {e}")
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        if not self.redis_client:
+            return None
+        try:
+            raw = await self.redis_client.get(key)
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {e}")
+            return None
+        return CachedResponse.from_json(raw) if raw else None
+
+    async def set(self, key: str, entry: CachedResponse, ttl: float):
+        if not self.redis_client:
+            return
+        try:
+            await self.redis_client.set(key, entry.to_json(), ex=max(1, int(ttl)))
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {e}")
+
+    async def invalidate(self, prefix: str):
+        if not self.redis_client:
+            return
+        try:
+            keys = [key async for key in self.redis_client.scan_iter(match=f"{prefix}*", count=500)]
+            if keys:
+                await self.redis_client.delete(*keys)
+        except Exception as e:
+            logger.warning(f"Response cache invalidation failed: {e}")
+
+    async def close(self):
+        """Close Redis connection"""
+        if self.redis_client:
+            await self.redis_client.close()
+
+
+class ResponseCache:
+    """Gateway response cache for read-mostly routes"""
+
+    def __init__(self):
+        self.store = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.store is not None
+
+    async def start(self):
+        if not settings.RESPONSE_CACHE_ENABLED:
+            return
+        if settings.RESPONSE_CACHE_BACKEND == "redis" and redis is not None:
+            store = RedisCacheStore()
+            await store.connect()
+            self.store = store
+        else:
+            self.store = MemoryCacheStore(settings.RESPONSE_CACHE_MAX_ENTRIES)
+        logger.info(f"Response cache enabled ({type(self.store).__name__})")
+
+    async def close(self):
+        if self.store:
+            await self.store.close()
+            self.store = None
+
+    @staticmethod
+    def scope(route_name: str, user_key: Optional[str]) -> str:
+        """Key prefix shared by all entries of a route (and user, if per-user)"""
+        return f"{CACHE_KEY_PREFIX}{route_name}:{user_key or '-'}:"
+
+    @staticmethod
+    def key(route_name: str, user_key: Optional[str], path: str, query: str) -> str:
+        return f"{ResponseCache.scope(route_name, user_key)}{path}?{query}"
+
+    async def get(self, key: str) -> Optional[CachedResponse]:
+        return await self.store.get(key)
+
+    async def set(self, key: str, entry: CachedResponse, ttl: float):
+        await self.store.set(key, entry, ttl)
+
+    async def invalidate(self, route_name: str, user_key: Optional[str]):
+        await self.store.invalidate(self.scope(route_name, user_key))
+
+
+# Global response cache instance
+response_cache = ResponseCache()
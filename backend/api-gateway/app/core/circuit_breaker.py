@@ -0,0 +1,172 @@
+import logging
+import time
+from collections import deque
+from typing import Dict
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the upstream's breaker is open"""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(f"Circuit open for upstream '{upstream}'")
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Closed/open/half-open breaker driven by error rate and slow-call rate.
+
+    Outcomes of the last WINDOW_SIZE calls are kept. Once at least MIN_CALLS
+    are recorded and either rate crosses its threshold the breaker opens and
+    calls fail fast. After OPEN_SECONDS a few probe calls are let through
+    (half-open); if they all succeed the breaker closes, otherwise it opens
+    again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str):
+        self.name = name
+        self.state = self.CLOSED
+        self._window: deque = deque(maxlen=settings.CIRCUIT_BREAKER_WINDOW_SIZE)
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def _transition(self, state: str):
+        if state != self.state:
+            logger.warning(f"Circuit breaker for '{self.name}': {self.state} -> {state}")
+        self.state = state
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        if state == self.OPEN:
+            self._opened_at = time.monotonic()
+        elif state == self.CLOSED:
+            self._window.clear()
+
+    def retry_after(self) -> float:
+        remaining = self._opened_at + settings.CIRCUIT_BREAKER_OPEN_SECONDS - time.monotonic()
+        return max(0.0, remaining)
+
+    def before_call(self):
+        """Admit a call or raise CircuitOpenError"""
+        if not settings.CIRCUIT_BREAKER_ENABLED:
+            return
+        if self.state == self.OPEN:
+            if self.retry_after() > 0:
+                raise CircuitOpenError(self.name, self.retry_after())
+            self._transition(self.HALF_OPEN)
+
+        if self.state == self.HALF_OPEN:
+            if self._probes_in_flight >= settings.CIRCUIT_BREAKER_HALF_OPEN_CALLS:
+                raise CircuitOpenError(self.name, 1.0)
+            self._probes_in_flight += 1
+
+    def record(self, success: bool, duration: float):
+        """Record the outcome of an admitted call"""
+        if not settings.CIRCUIT_BREAKER_ENABLED:
+            return
+        slow = duration >= settings.CIRCUIT_BREAKER_SLOW_CALL_SECONDS
+
+        if self.state == self.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+            if not success or slow:
+                self._transition(self.OPEN)
+                return
+            self._probe_successes += 1
+            if self._probe_successes >= settings.CIRCUIT_BREAKER_HALF_OPEN_CALLS:
+                self._transition(self.CLOSED)
+            return
+
+        if self.state != self.CLOSED:
+            return
+
+        self._window.append((not success, slow))
+        if len(self._window) < settings.CIRCUIT_BREAKER_MIN_CALLS:
+            return
+        failure_rate, slow_rate = self._rates()
+        if (
+            failure_rate >= settings.CIRCUIT_BREAKER_FAILURE_RATE
+            or slow_rate >= settings.CIRCUIT_BREAKER_SLOW_CALL_RATE
+        ):
+            self._transition(self.OPEN)
+
+    def release(self):
+        """Free a half-open probe slot for a call that ended without an outcome"""
+        if self.state == self.HALF_OPEN:
+            self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def _rates(self) -> tuple[float, float]:
+        calls = len(self._window)
+        if not calls:
+            return 0.0, 0.0
+        failures = sum(1 for failed, _ in self._window if failed)
+        slow = sum(1 for _, is_slow in self._window if is_slow)
+        return failures / calls, slow / calls
+
+    def stats(self) -> dict:
+        failure_rate, slow_rate = self._rates()
+        stats = {
+            "state": self.state,
+            "calls": len(self._window),
+            "failure_rate": round(failure_rate, 4),
+            "slow_call_rate": round(slow_rate, 4),
+        }
+        if self.state == self.OPEN:
+            stats["retry_after"] = round(self.retry_after(), 1)
+        return stats
+
+
+class RetryBudget:
+    """Caps retries to a fraction of regular traffic to an upstream.
+
+    Every request deposits RETRY_BUDGET_RATIO tokens (up to RETRY_BUDGET_MAX)
+    and every retry spends one, so retries cannot multiply load during an
+    outage.
+    """
+
+    def __init__(self):
+        self.tokens = float(settings.RETRY_BUDGET_MAX)
+
+    def deposit(self):
+        self.tokens = min(float(settings.RETRY_BUDGET_MAX), self.tokens + settings.RETRY_BUDGET_RATIO)
+
+    def withdraw(self) -> bool:
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+class CircuitBreakerRegistry:
+    """Breakers and retry budgets, one per upstream service"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._budgets: Dict[str, RetryBudget] = {}
+
+    def breaker(self, upstream: str) -> CircuitBreaker:
+        if upstream not in self._breakers:
+            self._breakers[upstream] = CircuitBreaker(upstream)
+        return self._breakers[upstream]
+
+    def retry_budget(self, upstream: str) -> RetryBudget:
+        if upstream not in self._budgets:
+            self._budgets[upstream] = RetryBudget()
+        return self._budgets[upstream]
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            name: {**breaker.stats(), "retry_tokens": round(self.retry_budget(name).tokens, 1)}
+            for name, breaker in self._breakers.items()
+        }
+
+
+# Global circuit breaker registry
+circuit_breakers = CircuitBreakerRegistry()
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Any, Dict, List
 
 
 class Settings(BaseSettings):
@@ -15,6 +15,102 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
     REQUEST_TIMEOUT: float = 30.0
 
+    # Extra upstream services, name -> base URL (JSON in env)
+    EXTRA_UPSTREAMS: Dict[str, str] = {}
+
+    # Route additions/overrides, prefix -> {"upstream", "prefix", "timeout",
+    # "retries", "cacheable", "cache_ttl", "cache_per_user", "coalesce",
+    # "rate_limit", "rate_burst", "rate_limit_endpoints"} (JSON in env);
+    # merged over the built-in table
+    GATEWAY_ROUTES: Dict[str, Dict[str, Any]] = {}
+
+    # Edge JWT verification: access tokens are checked with the auth-service key
+    # and forwarded identities are signed with INTERNAL_AUTH_SECRET
+    EDGE_AUTH_ENABLED: bool = True
+    JWT_SECRET_KEY: str = ""
+    JWT_ALGORITHM: str = "HS256"
+    INTERNAL_AUTH_SECRET: str = ""
+    # Check auth-service's Redis revocation list before signing an identity
+    AUTH_REVOCATION_CHECK: bool = True
+
+    # Response cache for routes marked cacheable. Writes through the gateway
+    # invalidate a route; changes made behind it are visible after the TTL.
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_BACKEND: str = "memory"  # "memory" or "redis"
+    RESPONSE_CACHE_TTL: float = 30.0
+    RESPONSE_CACHE_MAX_ENTRIES: int = 10000
+    RESPONSE_CACHE_MAX_BODY_SIZE: int = 512 * 1024
+
+    # Share one upstream call between identical concurrent GETs on routes
+    # marked "coalesce"
+    REQUEST_COALESCING_ENABLED: bool = True
+
+    # Per-upstream circuit breakers (failure = transport error or 502/503/504)
+    CIRCUIT_BREAKER_ENABLED: bool = True
+    CIRCUIT_BREAKER_WINDOW_SIZE: int = 50
+    CIRCUIT_BREAKER_MIN_CALLS: int = 10
+    CIRCUIT_BREAKER_FAILURE_RATE: float = 0.5
+    CIRCUIT_BREAKER_SLOW_CALL_SECONDS: float = 5.0
+    CIRCUIT_BREAKER_SLOW_CALL_RATE: float = 0.8
+    CIRCUIT_BREAKER_OPEN_SECONDS: float = 30.0
+    CIRCUIT_BREAKER_HALF_OPEN_CALLS: int = 3
+
+    # Retries of idempotent requests: jittered exponential backoff, limited
+    # to RETRY_BUDGET_RATIO retries per request on average. Routes without
+    # their own "retries" get RETRY_DEFAULT_ATTEMPTS
+    RETRY_DEFAULT_ATTEMPTS: int = 1
+    RETRY_BACKOFF_BASE: float = 0.05
+    RETRY_BACKOFF_MAX: float = 1.0
+    RETRY_BUDGET_RATIO: float = 0.2
+    RETRY_BUDGET_MAX: int = 10
+
+    # Token bucket rate limits per client (user, token or IP) across all
+    # routes; routes may add their own bucket via "rate_limit"/"rate_burst"
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMIT_BACKEND: str = "memory"  # "memory" or "redis"
+    RATE_LIMIT_CLIENT_RATE: float = 20.0
+    RATE_LIMIT_CLIENT_BURST: int = 60
+    RATE_LIMIT_MAX_KEYS: int = 100000
+    TRUST_FORWARDED_FOR: bool = False
+    # Reverse proxies in front of the gateway (IPs or CIDRs, JSON in env).
+    # For requests from them, anonymous clients are keyed by the last
+    # X-Forwarded-For address that is not itself a trusted proxy
+    TRUSTED_PROXIES: List[str] = []
+
+    # Concurrency caps per upstream (0 = unlimited); excess requests wait up
+    # to UPSTREAM_QUEUE_TIMEOUT and are rejected with 429 after that or when
+    # UPSTREAM_MAX_QUEUE requests are already waiting
+    UPSTREAM_MAX_CONCURRENCY: int = 100
+    UPSTREAM_CONCURRENCY_LIMITS: Dict[str, int] = {}
+    UPSTREAM_QUEUE_TIMEOUT: float = 2.0
+    UPSTREAM_MAX_QUEUE: int = 200
+
+    # Observability: JSON access log lines and the Prometheus /metrics endpoint
+    ACCESS_LOG_ENABLED: bool = True
+    METRICS_ENABLED: bool = True
+
+    # Response compression (gzip, or brotli when the package is installed)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+
+    # POST /api/v1/batch limits
+    BATCH_MAX_REQUESTS: int = 20
+    BATCH_MAX_CONCURRENCY: int = 5
+
+    # Upstream connection pools (one long-lived client per upstream service)
+    UPSTREAM_MAX_CONNECTIONS: int = 100
+    UPSTREAM_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    UPSTREAM_KEEPALIVE_EXPIRY: float = 30.0
+    UPSTREAM_CONNECT_TIMEOUT: float = 5.0
+    UPSTREAM_POOL_TIMEOUT: float = 5.0
+    UPSTREAM_HTTP2: bool = False
+
+    # Stream request/response bodies through the gateway instead of buffering them
+    PROXY_STREAMING: bool = True
+    PROXY_STREAM_CHUNK_SIZE: int = 64 * 1024
+
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -24,5 +120,19 @@ class Settings(BaseSettings):
         """Parse CORS_ORIGINS string into a list"""
         return [origin.strip() for origin in self.CORS_ORIGINS.split(',')]
 
+    @property
+    def upstreams(self) -> Dict[str, str]:
+        """Upstream service name -> base URL"""
+        return {
+            "auth": self.AUTH_SERVICE_URL,
+            "user": self.USER_SERVICE_URL,
+            "game": self.GAME_SERVICE_URL,
+            "progress": self.PROGRESS_SERVICE_URL,
+            "education": self.EDUCATION_SERVICE_URL,
+            "admin": self.ADMIN_SERVICE_URL,
+            "analytics": self.ANALYTICS_SERVICE_URL,
+            **self.EXTRA_UPSTREAMS,
+        }
+
 
 settings = Settings()
@@ -0,0 +1,85 @@
+import logging
+from typing import Dict, Optional
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamClients:
+    """Long-lived pooled HTTP clients, one per upstream service"""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _create_client(self, base_url: str) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=settings.UPSTREAM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.UPSTREAM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.UPSTREAM_KEEPALIVE_EXPIRY,
+        )
+        timeout = httpx.Timeout(
+            settings.REQUEST_TIMEOUT,
+            connect=settings.UPSTREAM_CONNECT_TIMEOUT,
+            pool=settings.UPSTREAM_POOL_TIMEOUT,
+        )
+        return httpx.AsyncClient(
+            base_url=base_url,
+            limits=limits,
+            timeout=timeout,
+            http2=settings.UPSTREAM_HTTP2,
+            follow_redirects=False,
+        )
+
+    async def start(self):
+        """Create a client for every configured upstream"""
+        for name, base_url in settings.upstreams.items():
+            if name not in self._clients:
+                self._clients[name] = self._create_client(base_url)
+        logger.info(f"Upstream clients started: {', '.join(self._clients)}")
+
+    def get(self, name: str) -> httpx.AsyncClient:
+        """Return the pooled client for an upstream, creating it lazily if needed"""
+        client = self._clients.get(name)
+        if client is None or client.is_closed:
+            client = self._create_client(settings.upstreams[name])
+            self._clients[name] = client
+        return client
+
+    async def close(self):
+        """Close all upstream clients"""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+    @staticmethod
+    def _pool_of(client: httpx.AsyncClient) -> Optional[object]:
+        transport = getattr(client, "_transport", None)
+        return getattr(transport, "_pool", None)
+
+    def pool_stats(self) -> Dict[str, dict]:
+        """Connection pool usage per upstream: in use, idle and waiting requests"""
+        stats = {}
+        for name, client in self._clients.items():
+            pool = self._pool_of(client)
+            if pool is None:
+                continue
+            connections = list(getattr(pool, "connections", []))
+            idle = sum(1 for conn in connections if conn.is_idle())
+            waiting = sum(
+                1 for req in getattr(pool, "_requests", [])
+                if getattr(req, "connection", None) is None
+            )
+            stats[name] = {
+                "in_use": len(connections) - idle,
+                "idle": idle,
+                "waiting": waiting,
+                "max_connections": settings.UPSTREAM_MAX_CONNECTIONS,
+            }
+        return stats
+
+
+# Global upstream clients instance
+upstream_clients = UpstreamClients()
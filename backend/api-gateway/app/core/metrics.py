@@ -0,0 +1,166 @@
+import json
+import logging
+import time
+import uuid
+from contextvars import ContextVar
+from typing import Iterable, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+access_logger = logging.getLogger("app.access")
+
+# Label used for requests that are not proxied to a service (/, /health, ...)
+GATEWAY_SERVICE = "gateway"
+# Label used for unknown /api/v1/{service} values, to keep cardinality bounded
+UNKNOWN_SERVICE = "unknown"
+
+SIZE_BUCKETS = (128, 512, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+REQUEST_DURATION = Histogram(
+    "gateway_request_duration_seconds",
+    "Time from receiving a request to sending the last response byte",
+    ["service", "method", "status"],
+)
+REQUEST_SIZE = Histogram(
+    "gateway_request_size_bytes",
+    "Request body size",
+    ["service", "method"],
+    buckets=SIZE_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "gateway_response_size_bytes",
+    "Response body size as sent to the client",
+    ["service", "method", "status"],
+    buckets=SIZE_BUCKETS,
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "gateway_requests_in_flight",
+    "Requests currently being handled by the gateway",
+    ["service"],
+)
+UPSTREAM_DURATION = Histogram(
+    "gateway_upstream_duration_seconds",
+    "Time until an upstream returned response headers, per attempt",
+    ["service", "upstream", "method", "status"],
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    "gateway_upstream_in_flight",
+    "Upstream requests currently holding a connection",
+    ["upstream"],
+)
+UPSTREAM_TIMEOUTS = Counter(
+    "gateway_upstream_timeouts_total",
+    "Upstream attempts that timed out",
+    ["service", "upstream"],
+)
+UPSTREAM_ERRORS = Counter(
+    "gateway_upstream_errors_total",
+    "Upstream attempts that failed with a transport error",
+    ["service", "upstream", "error"],
+)
+
+# Per-request record shared with the proxy, which adds upstream timings to it
+_access_record: ContextVar[Optional[dict]] = ContextVar("access_record", default=None)
+
+
+def observe_upstream(service: str, upstream: str, method: str, status: str, duration: float):
+    """Record one upstream attempt in the metrics and the current access record"""
+    UPSTREAM_DURATION.labels(service, upstream, method, status).observe(duration)
+    record = _access_record.get()
+    if record is not None:
+        record["upstream_calls"] += 1
+        record["upstream_seconds"] += duration
+
+
+class AccessLogMiddleware:
+    """Write one structured access log line per request and record metrics.
+
+    Sits outermost so durations cover the whole exchange, including streamed
+    bodies, and sizes are the bytes actually sent on the wire.
+    """
+
+    def __init__(self, app: ASGIApp, services: Iterable[str] = (), log_requests: bool = True):
+        self.app = app
+        self.services = set(services)
+        self.log_requests = log_requests
+
+    def _service_label(self, path: str) -> str:
+        if not path.startswith("/api/v1/"):
+            return GATEWAY_SERVICE
+        service = path[len("/api/v1/"):].split("/", 1)[0]
+        return service if service in self.services else UNKNOWN_SERVICE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        method = scope["method"]
+        service = self._service_label(scope["path"])
+        headers = Headers(scope=scope)
+        request_id = headers.get("x-request-id")
+        if not request_id:
+            # Tag the request so the id is forwarded upstream and returned
+            request_id = uuid.uuid4().hex
+            scope = {**scope, "headers": [*scope["headers"], (b"x-request-id", request_id.encode("latin-1"))]}
+        record = {"upstream_calls": 0, "upstream_seconds": 0.0}
+        token = _access_record.set(record)
+
+        request_size = 0
+        response_size = 0
+        status_code = 500
+        cache_status = None
+
+        async def counting_receive() -> Message:
+            nonlocal request_size
+            message = await receive()
+            if message["type"] == "http.request":
+                request_size += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message: Message) -> None:
+            nonlocal response_size, status_code, cache_status
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                response_headers = Headers(raw=message["headers"])
+                cache_status = response_headers.get("x-cache")
+                if "x-request-id" not in response_headers:
+                    message["headers"] = [*message.get("headers", []), (b"x-request-id", request_id.encode("latin-1"))]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(service)
+        in_flight.inc()
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            in_flight.dec()
+            _access_record.reset(token)
+            duration = time.perf_counter() - started
+            status_label = str(status_code)
+
+            REQUEST_DURATION.labels(service, method, status_label).observe(duration)
+            REQUEST_SIZE.labels(service, method).observe(request_size)
+            RESPONSE_SIZE.labels(service, method, status_label).observe(response_size)
+
+            if self.log_requests:
+                client = scope.get("client")
+                access_logger.info(json.dumps({
+                    "request_id": request_id,
+                    "method": method,
+                    "path": scope["path"],
+                    "service": service,
+                    "status": status_code,
+                    "duration_ms": round(duration * 1000, 2),
+                    "upstream_ms": round(record["upstream_seconds"] * 1000, 2),
+                    "upstream_calls": record["upstream_calls"],
+                    "request_bytes": request_size,
+                    "response_bytes": response_size,
+                    "cache": cache_status,
+                    "client": client[0] if client else None,
+                    "user_agent": headers.get("user-agent"),
+                }))
@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_KEY_PREFIX = "gw:rl:"
+
+# Atomic token bucket: refill by elapsed time, then take one token if possible.
+# Returns {allowed, seconds until a token is available}.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or burst
+local ts = tonumber(data[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(retry_after)}
+"""
+
+
+class RateLimitExceeded(Exception):
+    def __init__(self, retry_after: float):
+        super().__init__("Rate limit exceeded")
+        self.retry_after = retry_after
+
+
+class LoadShedError(Exception):
+    def __init__(self, upstream: str):
+        super().__init__(f"Upstream '{upstream}' is at its concurrency limit")
+        self.upstream = upstream
+
+
+class MemoryBucketStore:
+    """In-process token buckets, LRU-bounded to RATE_LIMIT_MAX_KEYS"""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()
+
+    async def take(self, key: str, rate: float, burst: int) -> tuple[bool, float]:
+        now = time.monotonic()
+        tokens, ts = self._buckets.get(key, (float(burst), now))
+        tokens = min(float(burst), tokens + (now - ts) * rate)
+        if tokens >= 1:
+            allowed, retry_after = True, 0.0
+            tokens -= 1
+        else:
+            allowed, retry_after = False, (1 - tokens) / rate
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return allowed, retry_after
+
+    async def close(self):
+        self._buckets.clear()
+
+
+class RedisBucketStore:
+    """Token buckets in Redis, shared by all gateway replicas"""
+
+    def __init__(self):
+        self.redis_client: Optional["redis.Redis"] = None
+        self._script = None
+
+    async def connect(self):
+        """Connect to Redis"""
+        try:
+            self.redis_client = await redis.from_url(settings.REDIS_URL, decode_responses=True)
+            self._script = self.redis_client.register_script(TOKEN_BUCKET_SCRIPT)
+        except Exception as e:
+            logger.error(f"Failed to connect to Redis: {e}")
+
+    async def take(self, key: str, rate: float, burst: int) -> tuple[bool, float]:
+        if not self._script:
+            return True, 0.0
+        try:
+            allowed, retry_after = await self._script(keys=[key], args=[rate, burst])
+        except Exception as e:
+            # Fail open: losing Redis must not take the gateway down
+            logger.warning(f"Rate limit check failed: {e}")
+            return True, 0.0
+        return bool(int(allowed)), float(retry_after)
+
+    async def close(self):
+        """Close Redis connection"""
+        if self.redis_client:
+            await self.redis_client.close()
+
+
+class RateLimiter:
+    """Per-client and per-client-per-route token bucket rate limits"""
+
+    def __init__(self):
+        self.store = None
+
+    async def start(self):
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        if settings.RATE_LIMIT_BACKEND == "redis" and redis is not None:
+            store = RedisBucketStore()
+            await store.connect()
+            self.store = store
+        else:
+            self.store = MemoryBucketStore(settings.RATE_LIMIT_MAX_KEYS)
+
+    async def close(self):
+        if self.store:
+            await self.store.close()
+            self.store = None
+
+    async def check(self, client_key: str, route_name: str, route_rate: Optional[float], route_burst: Optional[int]):
+        """Take a token from the client's buckets or raise RateLimitExceeded"""
+        if self.store is None:
+            return
+
+        allowed, retry_after = await self.store.take(
+            f"{RATE_LIMIT_KEY_PREFIX}{client_key}",
+            settings.RATE_LIMIT_CLIENT_RATE,
+            settings.RATE_LIMIT_CLIENT_BURST,
+        )
+        if not allowed:
+            raise RateLimitExceeded(retry_after)
+
+        if route_rate:
+            allowed, retry_after = await self.store.take(
+                f"{RATE_LIMIT_KEY_PREFIX}{client_key}:{route_name}",
+                route_rate,
+                route_burst or max(1, math.ceil(route_rate)),
+            )
+            if not allowed:
+                raise RateLimitExceeded(retry_after)
+
+
+class ConcurrencyLimiter:
+    """Caps in-flight requests to one upstream; excess requests queue until
+    UPSTREAM_QUEUE_TIMEOUT and are shed when it passes or the queue is full"""
+
+    def __init__(self, name: str, limit: int):
+        self.name = name
+        self.limit = limit
+        self.waiting = 0
+        self.in_flight = 0
+        self._semaphore = asyncio.Semaphore(limit)
+
+    async def acquire(self):
+        if self._semaphore.locked() and self.waiting >= settings.UPSTREAM_MAX_QUEUE:
+            raise LoadShedError(self.name)
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), settings.UPSTREAM_QUEUE_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise LoadShedError(self.name)
+        finally:
+            self.waiting -= 1
+        self.in_flight += 1
+
+    def release(self):
+        self.in_flight -= 1
+        self._semaphore.release()
+
+
+class ConcurrencyLimits:
+    """Concurrency limiters, one per upstream service"""
+
+    def __init__(self):
+        self._limiters: Dict[str, ConcurrencyLimiter] = {}
+
+    def get(self, upstream: str) -> Optional[ConcurrencyLimiter]:
+        limit = settings.UPSTREAM_CONCURRENCY_LIMITS.get(upstream, settings.UPSTREAM_MAX_CONCURRENCY)
+        if limit <= 0:
+            return None
+        if upstream not in self._limiters:
+            self._limiters[upstream] = ConcurrencyLimiter(upstream, limit)
+        return self._limiters[upstream]
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            name: {"in_flight": limiter.in_flight, "waiting": limiter.waiting, "limit": limiter.limit}
+            for name, limiter in self._limiters.items()
+        }
+
+
+# Global admission control instances
+rate_limiter = RateLimiter()
+concurrency_limits = ConcurrencyLimits()
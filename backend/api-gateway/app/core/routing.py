@@ -0,0 +1,89 @@
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+
+class Route(BaseModel):
+    """A public gateway prefix and how it maps onto an upstream service"""
+    name: str
+    upstream: str
+    prefix: str
+    timeout: float
+    retries: int = 0
+    cacheable: bool = False
+    cache_ttl: Optional[float] = None
+    cache_per_user: bool = True
+    coalesce: bool = False
+    rate_limit: Optional[float] = None
+    rate_burst: Optional[int] = None
+    rate_limit_endpoints: Optional[List[str]] = None
+
+    def rate_limited(self, method: str, path: str) -> bool:
+        """Whether the route's own bucket applies to this request"""
+        if not self.rate_limit:
+            return False
+        if self.rate_limit_endpoints is None:
+            return True
+        return f"{method} /{path.strip('/')}" in self.rate_limit_endpoints
+
+    def url_for(self, path: str) -> str:
+        """Upstream path for a request below this route"""
+        return f"{self.prefix}/{path}" if path else self.prefix
+
+
+# Default routes: public prefix -> upstream service name (see settings.upstreams).
+# "retries" defaults to RETRY_DEFAULT_ATTEMPTS and only covers idempotent methods;
+# "cache_per_user" also scopes request coalescing to the caller's identity;
+# "rate_limit"/"rate_burst" add a per-client token bucket (requests/second),
+# limited to "rate_limit_endpoints" ("METHOD /path" below the prefix) if given.
+DEFAULT_ROUTES: Dict[str, dict] = {
+    "auth": {"upstream": "auth"},
+    "users": {"upstream": "user", "coalesce": True},
+    "budget": {"upstream": "game", "rate_limit": 1.0, "rate_burst": 5, "rate_limit_endpoints": ["POST /plan"]},
+    "savings": {"upstream": "game"},
+    "categories": {"upstream": "game", "cacheable": True, "coalesce": True},
+    "transactions": {"upstream": "progress"},
+    "quests": {"upstream": "progress", "coalesce": True},
+    "quizzes": {"upstream": "education", "cacheable": True, "coalesce": True},
+    "badges": {"upstream": "education", "cacheable": True, "coalesce": True},
+    "guided": {"upstream": "education", "coalesce": True},
+    "achievements": {"upstream": "education", "cacheable": True, "coalesce": True},
+    "daily-challenges": {"upstream": "education", "cacheable": True, "coalesce": True},
+    "admin": {"upstream": "admin"},
+    "analytics": {"upstream": "analytics"},
+}
+
+DEFAULT_PREFIX_TEMPLATE = "/api/v1/{service}"
+
+
+def _build_route(name: str, config: dict) -> Route:
+    upstream = config["upstream"]
+    if upstream not in settings.upstreams:
+        raise ValueError(f"Route '{name}' points to unknown upstream '{upstream}'")
+
+    template = config.get("prefix", DEFAULT_PREFIX_TEMPLATE)
+    return Route(
+        name=name,
+        upstream=upstream,
+        prefix=template.format(service=name).rstrip("/"),
+        timeout=config.get("timeout", settings.REQUEST_TIMEOUT),
+        # Only applied to idempotent methods, see proxy._forward
+        retries=config.get("retries", settings.RETRY_DEFAULT_ATTEMPTS),
+        cacheable=config.get("cacheable", False),
+        cache_ttl=config.get("cache_ttl"),
+        cache_per_user=config.get("cache_per_user", True),
+        coalesce=config.get("coalesce", False),
+        rate_limit=config.get("rate_limit"),
+        rate_burst=config.get("rate_burst"),
+        rate_limit_endpoints=config.get("rate_limit_endpoints"),
+    )
+
+
+def build_routing_table(overrides: Optional[Dict[str, dict]] = None) -> Dict[str, Route]:
+    """Merge the default routes with GATEWAY_ROUTES and resolve every entry once"""
+    routes = {name: dict(config) for name, config in DEFAULT_ROUTES.items()}
+    for name, config in (overrides if overrides is not None else settings.GATEWAY_ROUTES).items():
+        routes.setdefault(name, {}).update(config)
+
+    return {name: _build_route(name, config) for name, config in routes.items()}
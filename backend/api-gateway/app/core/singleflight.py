@@ -0,0 +1,40 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key"""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.leaders = 0
+        self.followers = 0
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            self.leaders += 1
+            # Run in its own task so a disconnecting leader does not cancel
+            # the call for everyone waiting on it
+            task = asyncio.create_task(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._calls.pop(key, None))
+        else:
+            self.followers += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> dict:
+        total = self.leaders + self.followers
+        return {
+            "upstream_calls": self.leaders,
+            "coalesced": self.followers,
+            "coalescing_ratio": round(self.followers / total, 4) if total else 0.0,
+            "in_flight": len(self._calls),
+        }
+
+
+# Global request coalescer instance
+request_coalescer = SingleFlight()
@@ -1,15 +1,40 @@
+from contextlib import asynccontextmanager
+import logging
 from fastapi import FastAPI, Request, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
-import httpx
 
+from app.core.cache import response_cache
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
-from app.routers import proxy, health
+from app.core.http_client import upstream_clients
+from app.core.metrics import AccessLogMiddleware
+from app.core.rate_limit import rate_limiter
+from app.core.responses import FastJSONResponse
+from app.routers import batch, metrics, proxy, health
+
+logging.basicConfig(level=logging.INFO)
+# Upstream calls are covered by the access log; httpx would log each one again
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await upstream_clients.start()
+    await response_cache.start()
+    await rate_limiter.start()
+    yield
+    await rate_limiter.close()
+    await response_cache.close()
+    await upstream_clients.close()
+
 
 app = FastAPI(
     title="API Gateway",
     description="API Gateway for FinTech Education Platform",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -20,7 +45,21 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.COMPRESSION_ENABLED:
+    app.add_middleware(CompressionMiddleware, minimum_size=settings.COMPRESSION_MIN_SIZE)
+
+# Outermost, so timings and sizes cover the full exchange as the client sees it
+app.add_middleware(
+    AccessLogMiddleware,
+    services=[*proxy.SERVICE_ROUTES, "batch"],
+    log_requests=settings.ACCESS_LOG_ENABLED,
+)
+
 app.include_router(health.router, prefix="/health", tags=["health"])
+if settings.METRICS_ENABLED:
+    app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
+# Registered before the proxy so /api/v1/batch is not taken as a service name
+app.include_router(batch.router, prefix="/api/v1/batch", tags=["batch"])
 app.include_router(proxy.router, prefix="/api/v1", tags=["api"])
 
 
@@ -30,20 +69,7 @@ async def root():
         "service": "api-gateway",
         "version": "1.0.0",
         "endpoints": {
-            "auth": "/api/v1/auth",
-            "users": "/api/v1/users",
-            "budget": "/api/v1/budget",
-            "savings": "/api/v1/savings",
-            "categories": "/api/v1/categories",
-            "transactions": "/api/v1/transactions",
-            "quests": "/api/v1/quests",
-            "quizzes": "/api/v1/quizzes",
-            "badges": "/api/v1/badges",
-            "guided": "/api/v1/guided",
-            "achievements": "/api/v1/achievements",
-            "daily-challenges": "/api/v1/daily-challenges",
-            "admin": "/api/v1/admin",
-            "analytics": "/api/v1/analytics"
+            name: f"/api/v1/{name}" for name in proxy.SERVICE_ROUTES
         }
     }
 
@@ -52,7 +78,8 @@ async def root():
 async def http_exception_handler(request: Request, exc: HTTPException):
     return JSONResponse(
         status_code=exc.status_code,
-        content={"detail": exc.detail}
+        content={"detail": exc.detail},
+        headers=getattr(exc, "headers", None)
     )
 
 
@@ -0,0 +1,115 @@
+import asyncio
+import json
+from typing import Optional
+from urllib.parse import urlsplit
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+
+from app.core.config import settings
+from app.routers.proxy import _proxy_request
+from app.schemas.batch import BatchItem, BatchItemResponse, BatchRequest, BatchResponse
+
+router = APIRouter()
+
+# Headers of the batch request that every sub-request inherits
+INHERITED_HEADERS = ("authorization", "accept-language", "user-agent", "x-forwarded-for", "x-correlation-id")
+
+
+def _sub_request(request: Request, item: BatchItem) -> tuple[str, str, Request]:
+    """Build a request for one batch item, as if the client had sent it directly"""
+    url = urlsplit(item.path)
+    service, _, path = url.path[len("/api/v1/"):].partition("/")
+
+    headers = {name: request.headers[name] for name in INHERITED_HEADERS if name in request.headers}
+    headers.update({name.lower(): value for name, value in item.headers.items()})
+
+    body = b""
+    if item.body is not None:
+        body = json.dumps(item.body).encode()
+        headers["content-type"] = "application/json"
+        headers["content-length"] = str(len(body))
+
+    scope = {
+        "type": "http",
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": item.method,
+        "scheme": request.url.scheme,
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "root_path": request.scope.get("root_path", ""),
+        "query_string": url.query.encode(),
+        "headers": [(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()],
+        "client": request.scope.get("client"),
+        "server": request.scope.get("server"),
+        "app": request.scope.get("app"),
+    }
+
+    async def receive():
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    return service, path, Request(scope, receive)
+
+
+def _decode_body(content_type: Optional[str], body: bytes):
+    if not body:
+        return None
+    if content_type and "json" in content_type:
+        try:
+            return json.loads(body)
+        except ValueError:
+            pass
+    return body.decode(errors="replace")
+
+
+async def _run_item(request: Request, item: BatchItem, semaphore: asyncio.Semaphore) -> BatchItemResponse:
+    service, path, sub_request = _sub_request(request, item)
+    if service == "batch":
+        return BatchItemResponse(id=item.id, status=status.HTTP_400_BAD_REQUEST, body={"detail": "Nested batches are not allowed"})
+
+    async with semaphore:
+        try:
+            response = await _proxy_request(service, path, sub_request)
+        except HTTPException as e:
+            return BatchItemResponse(id=item.id, status=e.status_code, headers=e.headers or {}, body={"detail": e.detail})
+
+        if isinstance(response, StreamingResponse):
+            try:
+                body = b"".join([chunk async for chunk in response.body_iterator])
+            finally:
+                if response.background:
+                    await response.background()
+        else:
+            body = response.body
+
+    headers = {
+        name.decode("latin-1"): value.decode("latin-1")
+        for name, value in response.raw_headers
+        if name.lower() != b"content-length"
+    }
+    return BatchItemResponse(
+        id=item.id,
+        status=response.status_code,
+        headers=headers,
+        body=_decode_body(headers.get("content-type"), body),
+    )
+
+
+@router.post("", response_model=BatchResponse)
+async def batch(batch_request: BatchRequest, request: Request):
+    """Run several API calls concurrently and return all results at once.
+
+    Each item goes through the regular proxy path (routing, auth, caching,
+    limits) and gets its own status; one failing item does not fail the batch.
+    """
+    if len(batch_request.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A batch may contain at most {settings.BATCH_MAX_REQUESTS} requests"
+        )
+
+    semaphore = asyncio.Semaphore(settings.BATCH_MAX_CONCURRENCY)
+    responses = await asyncio.gather(
+        *[_run_item(request, item, semaphore) for item in batch_request.requests]
+    )
+    return BatchResponse(responses=responses)
@@ -1,32 +1,34 @@
 from fastapi import APIRouter
-import httpx
-from app.core.config import settings
+from app.core.circuit_breaker import circuit_breakers
+from app.core.http_client import upstream_clients
+from app.core.rate_limit import concurrency_limits
+from app.core.singleflight import request_coalescer
 
 router = APIRouter()
 
+HEALTH_CHECKED_UPSTREAMS = ["auth", "user", "game", "progress"]
+
 
 @router.get("/")
 async def health_check():
     services_status = {}
-    services = {
-        "auth": settings.AUTH_SERVICE_URL,
-        "user": settings.USER_SERVICE_URL,
-        "game": settings.GAME_SERVICE_URL,
-        "progress": settings.PROGRESS_SERVICE_URL,
-    }
 
-    async with httpx.AsyncClient(timeout=5.0) as client:
-        for name, url in services.items():
-            try:
-                response = await client.get(f"{url}/health/")
-                services_status[name] = "healthy" if response.status_code == 200 else "unhealthy"
-            except Exception:
-                services_status[name] = "unavailable"
+    for name in HEALTH_CHECKED_UPSTREAMS:
+        try:
+            client = upstream_clients.get(name)
+            response = await client.get("/health/", timeout=5.0)
+            services_status[name] = "healthy" if response.status_code == 200 else "unhealthy"
+        except Exception:
+            services_status[name] = "unavailable"
 
     all_healthy = all(status == "healthy" for status in services_status.values())
 
     return {
         "status": "healthy" if all_healthy else "degraded",
         "service": "api-gateway",
-        "services": services_status
+        "services": services_status,
+        "pools": upstream_clients.pool_stats(),
+        "coalescing": request_coalescer.stats(),
+        "breakers": circuit_breakers.stats(),
+        "concurrency": concurrency_limits.stats()
     }
@@ -1,70 +1,72 @@
 from fastapi import APIRouter, Request, HTTPException, status
-from fastapi.responses import Response
+from fastapi.responses import Response, StreamingResponse
+from starlette.background import BackgroundTask
+from typing import Optional
+import asyncio
+import hashlib
 import httpx
+import ipaddress
+import logging
+import math
+import random
+import time
+from app.core.auth import (
+    INTERNAL_IDENTITY_HEADER,
+    decode_access_token,
+    edge_auth_enabled,
+    sign_identity,
+)
+from app.core.cache import CachedResponse, response_cache
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError, RetryBudget, circuit_breakers
 from app.core.config import settings
+from app.core.http_client import upstream_clients
+from app.core.metrics import UPSTREAM_ERRORS, UPSTREAM_IN_FLIGHT, UPSTREAM_TIMEOUTS, observe_upstream
+from app.core.rate_limit import LoadShedError, RateLimitExceeded, concurrency_limits, rate_limiter
+from app.core.revocation import revocation_store
+from app.core.routing import Route, build_routing_table
+from app.core.singleflight import request_coalescer
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
-SERVICE_ROUTES = {
-    "auth": settings.AUTH_SERVICE_URL,
-    "users": settings.USER_SERVICE_URL,
-    "budget": settings.GAME_SERVICE_URL,
-    "savings": settings.GAME_SERVICE_URL,
-    "categories": settings.GAME_SERVICE_URL,
-    "transactions": settings.PROGRESS_SERVICE_URL,
-    "quests": settings.PROGRESS_SERVICE_URL,
-    "quizzes": settings.EDUCATION_SERVICE_URL,
-    "badges": settings.EDUCATION_SERVICE_URL,
-    "guided": settings.EDUCATION_SERVICE_URL,
-    "achievements": settings.EDUCATION_SERVICE_URL,
-    "daily-challenges": settings.EDUCATION_SERVICE_URL,
-    "admin": settings.ADMIN_SERVICE_URL,
-    "analytics": settings.ANALYTICS_SERVICE_URL,
+# Connection-scoped headers that must not be forwarded by a proxy (RFC 7230, 6.1)
+HOP_BY_HOP_HEADERS = {
+    "connection",
+    "keep-alive",
+    "proxy-authenticate",
+    "proxy-authorization",
+    "te",
+    "trailer",
+    "trailers",
+    "transfer-encoding",
+    "upgrade",
 }
 
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# Upstream statuses that count as failures for circuit breaking and retries
+UPSTREAM_FAILURE_STATUS_CODES = {502, 503, 504}
+
+# Routing table, resolved once at startup: public prefix -> Route
+SERVICE_ROUTES = build_routing_table()
+
+TRUSTED_PROXY_NETWORKS = [ipaddress.ip_network(proxy, strict=False) for proxy in settings.TRUSTED_PROXIES]
+
 
 async def _proxy_request(service: str, path: str, request: Request):
-    if service not in SERVICE_ROUTES:
+    route = SERVICE_ROUTES.get(service)
+    if route is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Service '{service}' not found"
         )
 
-    base_url = SERVICE_ROUTES[service]
-    # Special handling for transactions and quests - they're already under /api/v1/transactions
-    if service in ["transactions", "quests"]:
-        if path:
-            url = f"{base_url}/api/v1/{service}/{path}"
-        else:
-            url = f"{base_url}/api/v1/{service}"
-    elif service in ["quizzes", "badges", "guided", "achievements", "daily-challenges"]:
-        # Education service endpoints are already under /api/v1/
-        if path:
-            url = f"{base_url}/api/v1/{service}/{path}"
-        else:
-            url = f"{base_url}/api/v1/{service}"
-    elif service == "admin":
-        # Admin service endpoints are under /api/v1/admin/
-        if path:
-            url = f"{base_url}/api/v1/admin/{path}"
-        else:
-            url = f"{base_url}/api/v1/admin"
-    elif service == "analytics":
-        # Analytics service endpoints are under /api/v1/analytics/
-        if path:
-            url = f"{base_url}/api/v1/analytics/{path}"
-        else:
-            url = f"{base_url}/api/v1/analytics"
-    else:
-        # For categories, budget, savings - they're already under /api/v1 in game-service
-        if path:
-            url = f"{base_url}/api/v1/{service}/{path}"
-        else:
-            url = f"{base_url}/api/v1/{service}"
+    url = route.url_for(path)
 
-    headers = dict(request.headers)
+    headers = _filter_headers(request.headers)
     headers.pop("host", None)
-    headers.pop("content-length", None)
     
     # Ensure Authorization header is preserved with correct case
     auth_header = None
@@ -74,29 +76,63 @@ async def _proxy_request(service: str, path: str, request: Request):
     elif "Authorization" in headers:
         auth_header = headers.get("Authorization")
     
+    # Never trust an identity header supplied by the client
+    headers.pop(INTERNAL_IDENTITY_HEADER.lower(), None)
+
+    claims = None
     if auth_header:
         headers["Authorization"] = auth_header
-        # Debug logging for admin requests
-        if service == "admin":
-            print(f"[GATEWAY] Forwarding Authorization header: {auth_header[:50]}...")
+        # Admin requests carry the admin panel's own bearer, not a user JWT
+        if service != "admin" and edge_auth_enabled() and auth_header.startswith("Bearer "):
+            claims = decode_access_token(auth_header[len("Bearer "):])
+            if claims and await revocation_store.is_revoked(claims):
+                # Let the service reject it rather than vouch for it
+                claims = None
+            if claims:
+                headers[INTERNAL_IDENTITY_HEADER] = sign_identity(claims)
+
+    try:
+        route_limited = route.rate_limited(request.method, path)
+        await rate_limiter.check(
+            _client_key(request, auth_header, claims),
+            route.name,
+            route.rate_limit if route_limited else None,
+            route.rate_burst if route_limited else None
+        )
+    except RateLimitExceeded as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests",
+            headers={"Retry-After": str(max(1, math.ceil(e.retry_after)))}
+        )
 
-    body = await request.body()
+    cached = response_cache.enabled and route.cacheable
+    coalesced = settings.REQUEST_COALESCING_ENABLED and route.coalesce and request.method == "GET"
+    user_key = _user_key(route, auth_header, claims) if cached or coalesced else None
 
     try:
-        async with httpx.AsyncClient(timeout=settings.REQUEST_TIMEOUT, follow_redirects=False) as client:
-            response = await client.request(
-                method=request.method,
-                url=url,
-                headers=headers,
-                content=body,
-                params=request.query_params
-            )
+        if cached and request.method == "GET":
+            return await _cached_get(route, url, headers, request, user_key)
+        if coalesced:
+            fetched = await _fetch_buffered(route, url, headers, request, user_key)
+            return Response(content=fetched.body, status_code=fetched.status_code, headers=fetched.headers)
 
-            return Response(
-                content=response.content,
-                status_code=response.status_code,
-                headers=dict(response.headers)
-            )
+        response = await _forward(route, url, headers, request)
+        if cached and request.method in WRITE_METHODS:
+            await response_cache.invalidate(route.name, user_key)
+        return response
+    except LoadShedError:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Service is busy, try again later",
+            headers={"Retry-After": "1"}
+        )
+    except CircuitOpenError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Service temporarily unavailable",
+            headers={"Retry-After": str(max(1, round(e.retry_after)))}
+        )
     except httpx.TimeoutException:
         raise HTTPException(
             status_code=status.HTTP_504_GATEWAY_TIMEOUT,
@@ -109,6 +145,326 @@ async def _proxy_request(service: str, path: str, request: Request):
         )
 
 
+def _filter_headers(headers) -> dict:
+    """Drop hop-by-hop headers, including any listed in the Connection header"""
+    connection_tokens = {
+        token.strip().lower()
+        for token in headers.get("connection", "").split(",")
+        if token.strip()
+    }
+    excluded = HOP_BY_HOP_HEADERS | connection_tokens
+    return {
+        key: value for key, value in headers.items()
+        if key.lower() not in excluded
+    }
+
+
+async def _forward(route: Route, url: str, headers: dict, request: Request) -> Response:
+    """Send the request to the route's upstream and relay the response.
+
+    In streaming mode the body is forwarded as it arrives from the client and
+    the upstream response is relayed chunk by chunk, so neither is held in
+    gateway memory. The upstream response is closed once the client has
+    received it or disconnected, which releases the pooled connection.
+    """
+    client = upstream_clients.get(route.upstream)
+    has_body = "content-length" in request.headers or "transfer-encoding" in request.headers
+
+    if not has_body:
+        content = None
+    elif settings.PROXY_STREAMING:
+        content = request.stream()
+    else:
+        content = await request.body()
+
+    upstream_request = _build_upstream_request(client, route, url, headers, request, content)
+    # A streamed body can only be sent once
+    replayable = not (has_body and settings.PROXY_STREAMING)
+    retries = route.retries if replayable and request.method in IDEMPOTENT_METHODS else 0
+
+    response = await _send(client, upstream_request, route, retries)
+
+    if not settings.PROXY_STREAMING:
+        try:
+            body = await response.aread()
+        finally:
+            await _close_upstream(response, route)
+        response_headers = _filter_headers(response.headers)
+        response_headers.pop("content-length", None)
+        response_headers.pop("content-encoding", None)
+        return Response(
+            content=body,
+            status_code=response.status_code,
+            headers=response_headers
+        )
+
+    async def relay():
+        try:
+            async for chunk in response.aiter_raw(settings.PROXY_STREAM_CHUNK_SIZE):
+                yield chunk
+        except httpx.HTTPError as e:
+            logger.warning(f"Upstream stream interrupted for {url}: {e}")
+        finally:
+            # Starlette skips the background task when anything else escapes
+            # the body (e.g. a send failure), so close here as well
+            await _close_upstream(response, route)
+
+    return StreamingResponse(
+        relay(),
+        status_code=response.status_code,
+        headers=_filter_headers(response.headers),
+        background=BackgroundTask(_close_upstream, response, route)
+    )
+
+
+def _build_upstream_request(
+    client: httpx.AsyncClient,
+    route: Route,
+    url: str,
+    headers: dict,
+    request: Request,
+    content
+) -> httpx.Request:
+    return client.build_request(
+        method=request.method,
+        url=url,
+        headers=headers,
+        content=content,
+        params=request.query_params,
+        timeout=httpx.Timeout(
+            route.timeout,
+            connect=settings.UPSTREAM_CONNECT_TIMEOUT,
+            pool=settings.UPSTREAM_POOL_TIMEOUT,
+        )
+    )
+
+
+def _client_key(request: Request, auth_header: Optional[str], claims: Optional[dict]) -> str:
+    """Identity used for rate limiting: user, then bearer token, then client IP"""
+    if claims:
+        return f"user:{claims['sub']}"
+    if auth_header:
+        return "token:" + hashlib.sha256(auth_header.encode()).hexdigest()[:32]
+    return "ip:" + _client_ip(request)
+
+
+def _is_trusted_proxy(address: str) -> bool:
+    try:
+        ip = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(ip in network for network in TRUSTED_PROXY_NETWORKS)
+
+
+def _client_ip(request: Request) -> str:
+    """Address of the client, looking through trusted reverse proxies"""
+    peer = request.client.host if request.client else "unknown"
+    forwarded_for = request.headers.get("x-forwarded-for")
+    if not forwarded_for:
+        return peer
+    hops = [hop.strip() for hop in forwarded_for.split(",") if hop.strip()]
+    if not hops:
+        return peer
+    if settings.TRUST_FORWARDED_FOR:
+        return hops[0]
+    if not _is_trusted_proxy(peer):
+        return peer
+    # Entries left of the first untrusted hop could have been set by the client
+    for hop in reversed(hops):
+        if not _is_trusted_proxy(hop):
+            return hop
+    return hops[0]
+
+
+def _user_key(route: Route, auth_header: Optional[str], claims: Optional[dict]) -> Optional[str]:
+    """Identity part of cache and coalescing keys for per-user routes"""
+    if not route.cache_per_user:
+        return None
+    if claims:
+        return f"u{claims['sub']}"
+    if auth_header:
+        return "t" + hashlib.sha256(auth_header.encode()).hexdigest()[:32]
+    return None
+
+
+async def _fetch_buffered(
+    route: Route,
+    url: str,
+    headers: dict,
+    request: Request,
+    user_key: Optional[str]
+) -> CachedResponse:
+    """Fetch a body-less request from upstream into memory.
+
+    Identical concurrent requests on coalescing routes (same method, URL and,
+    for per-user routes, identity) share a single upstream call.
+    """
+    async def fetch() -> CachedResponse:
+        client = upstream_clients.get(route.upstream)
+        upstream_request = _build_upstream_request(client, route, url, headers, request, None)
+        response = await _send(client, upstream_request, route, route.retries)
+        try:
+            body = await response.aread()
+        finally:
+            await _close_upstream(response, route)
+
+        # The body has been decoded, so length and encoding are recomputed
+        response_headers = _filter_headers(response.headers)
+        response_headers.pop("content-length", None)
+        response_headers.pop("content-encoding", None)
+        return CachedResponse(response.status_code, response_headers, body)
+
+    if not (settings.REQUEST_COALESCING_ENABLED and route.coalesce):
+        return await fetch()
+
+    key = f"{request.method}:{route.name}:{user_key or '-'}:{url}?{request.query_params}"
+    return await request_coalescer.do(key, fetch)
+
+
+async def _cached_get(
+    route: Route,
+    url: str,
+    headers: dict,
+    request: Request,
+    user_key: Optional[str]
+) -> Response:
+    """Serve a GET from the response cache, filling it from upstream on a miss"""
+    key = response_cache.key(route.name, user_key, url, str(request.query_params))
+    entry = await response_cache.get(key)
+    if entry is not None:
+        return _cached_response(entry, request, "HIT")
+
+    fetched = await _fetch_buffered(route, url, headers, request, user_key)
+    cache_control = fetched.headers.get("cache-control", "").lower()
+    if (
+        fetched.status_code != 200
+        or "no-store" in cache_control
+        or len(fetched.body) > settings.RESPONSE_CACHE_MAX_BODY_SIZE
+    ):
+        return Response(content=fetched.body, status_code=fetched.status_code, headers=fetched.headers)
+
+    await response_cache.set(key, fetched, route.cache_ttl or settings.RESPONSE_CACHE_TTL)
+    return _cached_response(fetched, request, "MISS")
+
+
+def _cached_response(entry: CachedResponse, request: Request, cache_status: str) -> Response:
+    """Build the client response for a cache entry, honouring If-None-Match"""
+    headers = {**entry.headers, "ETag": entry.etag, "X-Cache": cache_status}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        tags = {tag.strip() for tag in if_none_match.split(",")}
+        if "*" in tags or entry.etag in tags or f"W/{entry.etag}" in tags:
+            headers.pop("content-type", None)
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=entry.body, status_code=entry.status_code, headers=headers)
+
+
+def _backoff(attempt: int) -> float:
+    """Full-jitter exponential backoff before retry number `attempt`"""
+    ceiling = min(settings.RETRY_BACKOFF_MAX, settings.RETRY_BACKOFF_BASE * 2 ** attempt)
+    return random.uniform(0, ceiling)
+
+
+async def _send(
+    client: httpx.AsyncClient,
+    upstream_request: httpx.Request,
+    route: Route,
+    retries: int
+) -> httpx.Response:
+    """Send through the upstream's concurrency limit and circuit breaker.
+
+    The returned response holds a concurrency slot until it is closed with
+    _close_upstream. Transport errors and 502/503/504 responses are retried
+    up to `retries` times with jittered backoff while the upstream's retry
+    budget allows it. Callers only pass retries > 0 for idempotent requests.
+    """
+    breaker = circuit_breakers.breaker(route.upstream)
+    budget = circuit_breakers.retry_budget(route.upstream)
+    budget.deposit()
+
+    limiter = concurrency_limits.get(route.upstream)
+    if limiter:
+        await limiter.acquire()
+    in_flight = UPSTREAM_IN_FLIGHT.labels(route.upstream)
+    in_flight.inc()
+    try:
+        return await _send_attempts(client, upstream_request, route, breaker, budget, retries)
+    except BaseException:
+        in_flight.dec()
+        if limiter:
+            limiter.release()
+        raise
+
+
+async def _send_attempts(
+    client: httpx.AsyncClient,
+    upstream_request: httpx.Request,
+    route: Route,
+    breaker: CircuitBreaker,
+    budget: RetryBudget,
+    retries: int
+) -> httpx.Response:
+    attempt = 0
+    while True:
+        breaker.before_call()
+        started = time.monotonic()
+        recorded = False
+        try:
+            response = await client.send(upstream_request, stream=True)
+        except httpx.TransportError as e:
+            elapsed = time.monotonic() - started
+            breaker.record(False, elapsed)
+            recorded = True
+            timed_out = isinstance(e, httpx.TimeoutException)
+            observe_upstream(
+                route.name, route.upstream, upstream_request.method,
+                "timeout" if timed_out else "error", elapsed
+            )
+            if timed_out:
+                UPSTREAM_TIMEOUTS.labels(route.name, route.upstream).inc()
+            else:
+                UPSTREAM_ERRORS.labels(route.name, route.upstream, type(e).__name__).inc()
+            if attempt >= retries or not budget.withdraw():
+                raise
+            logger.warning(f"Retrying {upstream_request.method} {upstream_request.url} after error: {e!r}")
+        else:
+            elapsed = time.monotonic() - started
+            failed = response.status_code in UPSTREAM_FAILURE_STATUS_CODES
+            breaker.record(not failed, elapsed)
+            observe_upstream(
+                route.name, route.upstream, upstream_request.method, str(response.status_code), elapsed
+            )
+            recorded = True
+            if not failed or attempt >= retries or not budget.withdraw():
+                return response
+            await response.aclose()
+            logger.warning(
+                f"Retrying {upstream_request.method} {upstream_request.url} "
+                f"after status {response.status_code}"
+            )
+        finally:
+            if not recorded:
+                breaker.release()
+
+        attempt += 1
+        await asyncio.sleep(_backoff(attempt))
+
+
+async def _close_upstream(response: httpx.Response, route: Route):
+    """Close an upstream response and free its concurrency slot; only the
+    first call for a response does anything"""
+    if response.extensions.get("gateway_closed"):
+        return
+    response.extensions["gateway_closed"] = True
+    try:
+        await response.aclose()
+    finally:
+        UPSTREAM_IN_FLIGHT.labels(route.upstream).dec()
+        limiter = concurrency_limits.get(route.upstream)
+        if limiter:
+            limiter.release()
+
+
 @router.api_route(
     "/{service}",
     methods=["GET", "POST", "PUT", "DELETE", "PATCH"],
@@ -0,0 +1,40 @@
+"""Report password hash and verify latency for each cost setting.
+
+Usage: python -m app.benchmark_hashing [--iterations N]
+"""
+import argparse
+
+from app.core.password_policy import (
+    MAX_ARGON2_TIME_COST,
+    MAX_BCRYPT_ROUNDS,
+    MIN_ARGON2_TIME_COST,
+    MIN_BCRYPT_ROUNDS,
+    measure,
+)
+from app.core.security import build_crypt_context
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--max-bcrypt-rounds", type=int, default=14)
+    parser.add_argument("--max-argon2-time-cost", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'policy':<28}{'hash ms':>10}{'verify ms':>12}")
+    for rounds in range(MIN_BCRYPT_ROUNDS, min(args.max_bcrypt_rounds, MAX_BCRYPT_ROUNDS) + 1):
+        hash_ms, verify_ms = measure(build_crypt_context("bcrypt", bcrypt_rounds=rounds), args.iterations)
+        print(f"{f'bcrypt rounds={rounds}':<28}{hash_ms:>10.1f}{verify_ms:>12.1f}")
+
+    try:
+        for time_cost in range(MIN_ARGON2_TIME_COST, min(args.max_argon2_time_cost, MAX_ARGON2_TIME_COST) + 1):
+            context = build_crypt_context("argon2", argon2_time_cost=time_cost)
+            hash_ms, verify_ms = measure(context, args.iterations)
+            print(f"{f'argon2id time_cost={time_cost}':<28}{hash_ms:>10.1f}{verify_ms:>12.1f}")
+    except Exception as e:
+        # passlib raises MissingBackendError without argon2-cffi
+        print(f"argon2id skipped: {e}")
+
+
+if __name__ == "__main__":
+    main()
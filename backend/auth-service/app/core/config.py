@@ -4,11 +4,33 @@ from typing import List
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    # Async (asyncpg) connection pool used by the API
+    DATABASE_POOL_SIZE: int = 10
+    DATABASE_MAX_OVERFLOW: int = 20
+    DATABASE_POOL_TIMEOUT: int = 30
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_STATEMENT_CACHE_SIZE: int = 100
     REDIS_URL: str = "redis://localhost:6379"
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Password hash policy: "bcrypt" or "argon2" (argon2id, needs argon2-cffi).
+    # With PASSWORD_HASH_TARGET_MS set, the cost is tuned at startup so one
+    # verification takes about that long on this machine
+    PASSWORD_HASH_SCHEME: str = "bcrypt"
+    BCRYPT_ROUNDS: int = 12
+    ARGON2_TIME_COST: int = 3
+    ARGON2_MEMORY_COST: int = 65536
+    ARGON2_PARALLELISM: int = 2
+    PASSWORD_HASH_TARGET_MS: int = 0
+    # Password hashing pool: "thread" or "process" workers (0 = one per CPU);
+    # requests beyond workers + max queue get 503
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 0
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+    # Reject tokens revoked by jti or by bumping the user's token generation
+    AUTH_REVOCATION_CHECK: bool = True
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8000"]
     ENVIRONMENT: str = "development"
 
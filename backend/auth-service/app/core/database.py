@@ -1,14 +1,54 @@
+from typing import AsyncGenerator
+
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
 from app.core.config import settings
 
+# Synchronous engine, kept for scripts and migrations
 engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+ASYNC_DRIVERS = {
+    "postgresql://": "postgresql+asyncpg://",
+    "sqlite://": "sqlite+aiosqlite://",
+}
+
+
+def _make_async_url(sync_url: str) -> str:
+    for prefix, async_prefix in ASYNC_DRIVERS.items():
+        if sync_url.startswith(prefix):
+            return sync_url.replace(prefix, async_prefix, 1)
+    return sync_url
+
+
+ASYNC_DATABASE_URL = _make_async_url(settings.DATABASE_URL)
+
+
+def _async_engine_options() -> dict:
+    if not ASYNC_DATABASE_URL.startswith("postgresql+asyncpg://"):
+        return {}
+    return {
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+        "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+        "connect_args": {
+            # asyncpg's own cache and SQLAlchemy's prepared statement cache;
+            # set to 0 behind a transaction-pooling pgbouncer
+            "statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+            "prepared_statement_cache_size": settings.DATABASE_STATEMENT_CACHE_SIZE,
+        },
+    }
+
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, pool_pre_ping=True, **_async_engine_options())
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False, class_=AsyncSession)
+
 
 def get_db():
     db = SessionLocal()
@@ -16,3 +56,8 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as session:
+        yield session
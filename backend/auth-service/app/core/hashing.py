@@ -0,0 +1,112 @@
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Optional, Tuple
+
+from fastapi import HTTPException, status
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_and_update_password
+
+logger = logging.getLogger(__name__)
+
+HASH_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 2.0, 5.0)
+
+HASH_DURATION = Histogram(
+    "auth_password_hash_seconds",
+    "CPU time spent hashing or verifying a password in a worker",
+    ["operation"],
+    buckets=HASH_BUCKETS,
+)
+HASH_WAIT = Histogram(
+    "auth_password_hash_wait_seconds",
+    "Time a hashing job waited for a free worker",
+    ["operation"],
+    buckets=HASH_BUCKETS,
+)
+HASH_PENDING = Gauge(
+    "auth_password_hash_pending",
+    "Hashing jobs running or queued",
+)
+HASH_REJECTED = Counter(
+    "auth_password_hash_rejected_total",
+    "Hashing jobs refused because the pool was saturated",
+    ["operation"],
+)
+
+
+def _timed(fn: Callable, *args):
+    """Run fn in the worker and report how long the work itself took"""
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+class PasswordHasher:
+    """Runs bcrypt off the event loop in a bounded worker pool.
+
+    bcrypt releases the GIL, so a thread pool already hashes in parallel;
+    PASSWORD_HASH_EXECUTOR=process isolates it in separate processes instead.
+    At most PASSWORD_HASH_WORKERS jobs run at once and PASSWORD_HASH_MAX_QUEUE
+    more may wait; beyond that requests get 503 instead of piling up.
+    """
+
+    def __init__(self):
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+
+    @property
+    def workers(self) -> int:
+        return settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+
+    def start(self):
+        if self._executor is not None:
+            return
+        if settings.PASSWORD_HASH_EXECUTOR == "process":
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        else:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        logger.info(f"Password hashing pool started: {self.workers} {settings.PASSWORD_HASH_EXECUTOR} workers")
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _run(self, operation: str, fn: Callable, *args):
+        if self._pending >= self.workers + settings.PASSWORD_HASH_MAX_QUEUE:
+            HASH_REJECTED.labels(operation).inc()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many sign-ins in progress, please try again",
+                headers={"Retry-After": "1"}
+            )
+
+        self.start()
+        self._pending += 1
+        HASH_PENDING.inc()
+        submitted = time.perf_counter()
+        try:
+            result, elapsed = await asyncio.get_running_loop().run_in_executor(
+                self._executor, _timed, fn, *args
+            )
+        finally:
+            self._pending -= 1
+            HASH_PENDING.dec()
+
+        HASH_DURATION.labels(operation).observe(elapsed)
+        HASH_WAIT.labels(operation).observe(max(0.0, time.perf_counter() - submitted - elapsed))
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._run("hash", get_password_hash, password)
+
+    async def verify_and_update(self, password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verify a password; also returns a new hash if the policy has changed"""
+        return await self._run("verify", verify_and_update_password, password, hashed_password)
+
+
+password_hasher = PasswordHasher()
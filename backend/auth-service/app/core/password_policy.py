@@ -0,0 +1,67 @@
+import logging
+import time
+
+from passlib.context import CryptContext
+
+from app.core.config import settings
+from app.core.security import build_crypt_context, configure_password_context
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_PASSWORD = "correct horse battery staple"
+
+# Never tune below these, whatever the target
+MIN_BCRYPT_ROUNDS = 10
+MAX_BCRYPT_ROUNDS = 16
+MIN_ARGON2_TIME_COST = 1
+MAX_ARGON2_TIME_COST = 10
+
+
+def measure(context: CryptContext, iterations: int = 3) -> tuple[float, float]:
+    """Average hash and verify time in milliseconds for a policy"""
+    hash_total = 0.0
+    verify_total = 0.0
+    for _ in range(iterations):
+        started = time.perf_counter()
+        hashed = context.hash(SAMPLE_PASSWORD)
+        hash_total += time.perf_counter() - started
+
+        started = time.perf_counter()
+        context.verify(SAMPLE_PASSWORD, hashed)
+        verify_total += time.perf_counter() - started
+    return hash_total * 1000 / iterations, verify_total * 1000 / iterations
+
+
+def tune_password_policy(target_ms: int) -> CryptContext:
+    """Pick the highest cost whose verify time stays within target_ms.
+
+    For bcrypt the cost is the number of rounds; for argon2id the time cost
+    is raised with memory and parallelism kept as configured.
+    """
+    if settings.PASSWORD_HASH_SCHEME == "argon2":
+        chosen = MIN_ARGON2_TIME_COST
+        for time_cost in range(MIN_ARGON2_TIME_COST, MAX_ARGON2_TIME_COST + 1):
+            _, verify_ms = measure(build_crypt_context(argon2_time_cost=time_cost), iterations=1)
+            if verify_ms > target_ms:
+                break
+            chosen = time_cost
+        logger.info(f"Password hashing tuned to {target_ms} ms: argon2id time_cost={chosen}")
+        return build_crypt_context(argon2_time_cost=chosen)
+
+    chosen = MIN_BCRYPT_ROUNDS
+    for rounds in range(MIN_BCRYPT_ROUNDS, MAX_BCRYPT_ROUNDS + 1):
+        _, verify_ms = measure(build_crypt_context(bcrypt_rounds=rounds), iterations=1)
+        if verify_ms > target_ms:
+            break
+        chosen = rounds
+        if verify_ms * 2 > target_ms:
+            # Each extra round doubles the cost
+            break
+    logger.info(f"Password hashing tuned to {target_ms} ms: bcrypt rounds={chosen}")
+    return build_crypt_context(bcrypt_rounds=chosen)
+
+
+def configure_password_policy():
+    """Apply the configured policy, tuning it first if a target is set"""
+    if settings.PASSWORD_HASH_TARGET_MS > 0:
+        configure_password_context(tune_password_policy(settings.PASSWORD_HASH_TARGET_MS))
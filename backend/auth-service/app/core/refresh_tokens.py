@@ -0,0 +1,134 @@
+import hashlib
+import logging
+import time
+import uuid
+from typing import Optional
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.security import create_refresh_token, decode_token
+
+logger = logging.getLogger(__name__)
+
+RECORD_KEY = "auth:refresh:{jti}"
+FAMILY_REVOKED_KEY = "auth:refresh-family-revoked:{family}"
+LEGACY_USED_KEY = "auth:refresh-legacy:{digest}"
+
+# KEYS[1] = token record, KEYS[2] = family revocation marker
+# ARGV[1] = how long to keep the revocation marker, in seconds
+# Marks the token as used in the same step as checking it, so two requests
+# can never both rotate the same refresh token.
+USE_SCRIPT = """
+if redis.call('EXISTS', KEYS[2]) == 1 then
+    return 'revoked'
+end
+local used = redis.call('HGET', KEYS[1], 'used')
+if not used then
+    return 'missing'
+end
+if used == '1' then
+    redis.call('SET', KEYS[2], '1', 'EX', ARGV[1])
+    return 'reused'
+end
+redis.call('HSET', KEYS[1], 'used', '1')
+return 'ok'
+"""
+
+
+class RefreshTokenStore:
+    """Redis-backed refresh-token rotation with reuse detection.
+
+    Each refresh token belongs to a family started at login. Using a token
+    spends it and issues the next one in the same family. Presenting a spent
+    token again means it leaked, so the whole family is revoked and the user
+    has to sign in again. Refreshing never touches Postgres.
+    """
+
+    def __init__(self):
+        self.redis_client = None
+        self._use_script = None
+
+    def _client(self):
+        if self.redis_client is None:
+            if redis is None:
+                raise RuntimeError("redis package is not installed")
+            self.redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        return self.redis_client
+
+    @staticmethod
+    def _unavailable(e: Exception) -> HTTPException:
+        logger.error(f"Refresh token store unavailable: {e}")
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Session store unavailable"
+        )
+
+    async def issue(self, claims: dict, family: Optional[str] = None) -> str:
+        """Create a refresh token, starting a new family unless one is given"""
+        family = family or uuid.uuid4().hex
+        token = create_refresh_token(data={**claims, "fam": family})
+        payload = decode_token(token)
+        ttl = max(1, int(payload["exp"] - time.time()))
+        try:
+            async with self._client().pipeline(transaction=True) as pipe:
+                pipe.hset(RECORD_KEY.format(jti=payload["jti"]), mapping={
+                    "family": family,
+                    "user_id": payload["sub"],
+                    "exp": payload["exp"],
+                    "used": "0",
+                })
+                pipe.expire(RECORD_KEY.format(jti=payload["jti"]), ttl)
+                await pipe.execute()
+        except Exception as e:
+            raise self._unavailable(e)
+        return token
+
+    async def use(self, payload: dict) -> str:
+        """Spend a decoded refresh token: "ok", "reused", "revoked" or "missing" """
+        jti = payload.get("jti")
+        family = payload.get("fam")
+        if not jti or not family:
+            return "missing"
+        client = self._client()
+        if self._use_script is None:
+            self._use_script = client.register_script(USE_SCRIPT)
+        try:
+            return await self._use_script(
+                keys=[RECORD_KEY.format(jti=jti), FAMILY_REVOKED_KEY.format(family=family)],
+                args=[settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS * 86400],
+            )
+        except Exception as e:
+            raise self._unavailable(e)
+
+    async def use_legacy(self, token: str, payload: dict) -> str:
+        """Spend a refresh token issued before rotation (no jti/fam): "ok" the
+        first time, "reused" after that. The marker lives until the token
+        expires; the caller starts a new family for the session."""
+        digest = hashlib.sha256(token.encode()).hexdigest()
+        ttl = max(1, int(payload["exp"] - time.time()))
+        try:
+            first = await self._client().set(LEGACY_USED_KEY.format(digest=digest), "1", nx=True, ex=ttl)
+        except Exception as e:
+            raise self._unavailable(e)
+        return "ok" if first else "reused"
+
+    async def revoke_family(self, family: Optional[str]):
+        """End a login session: no token of the family can be refreshed again"""
+        if not family:
+            return
+        try:
+            await self._client().set(
+                FAMILY_REVOKED_KEY.format(family=family), "1",
+                ex=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS * 86400
+            )
+        except Exception as e:
+            raise self._unavailable(e)
+
+
+refresh_token_store = RefreshTokenStore()
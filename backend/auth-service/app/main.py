@@ -3,20 +3,29 @@ from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.routers import auth, health
+from app.core.database import async_engine, Base
+from app.core.hashing import password_hasher
+from app.core.password_policy import configure_password_policy
+from app.core.responses import FastJSONResponse
+from app.routers import auth, health, metrics
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    Base.metadata.create_all(bind=engine)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    configure_password_policy()
+    password_hasher.start()
     yield
+    password_hasher.close()
+    await async_engine.dispose()
 
 
 app = FastAPI(
     title="Auth Service",
     description="Authentication and authorization service",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
     lifespan=lifespan,
 )
 
@@ -29,6 +38,7 @@ app.add_middleware(
 )
 
 app.include_router(health.router, prefix="/health", tags=["health"])
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["auth"])
 
 
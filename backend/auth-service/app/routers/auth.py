@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.schemas.auth import UserRegister, UserLogin, TokenResponse, TokenRefresh
+from app.core.database import get_async_db
+from app.core.refresh_tokens import refresh_token_store
+from app.core.revocation import revocation_store
+from app.core.security import decode_token
+from app.schemas.auth import UserRegister, UserLogin, TokenResponse, TokenRefresh, TokenLogout
 from app.services.auth_service import AuthService
 from app.models.user import User
 
@@ -11,36 +16,46 @@ router = APIRouter()
 security = HTTPBearer()
 
 
+async def _reject_revoked(token: str) -> Optional[dict]:
+    """Decode a token and fail with 401 if it has been revoked"""
+    payload = decode_token(token)
+    if payload and await revocation_store.is_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked"
+        )
+    return payload
+
+
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserRegister, db: Session = Depends(get_db)):
-    user = AuthService.register_user(db, user_data)
-    tokens = AuthService.create_tokens(user)
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
+    user = await AuthService.register_user(db, user_data)
+    tokens = await AuthService.create_tokens(user, await revocation_store.generation(user.id))
     return tokens
 
 
 @router.post("/login", response_model=TokenResponse)
-async def login(login_data: UserLogin, db: Session = Depends(get_db)):
-    user = AuthService.authenticate_user(db, login_data)
-    tokens = AuthService.create_tokens(user)
+async def login(login_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    user = await AuthService.authenticate_user(db, login_data)
+    tokens = await AuthService.create_tokens(user, await revocation_store.generation(user.id))
     return tokens
 
 
-@router.post("/refresh", response_model=dict)
-async def refresh_token(
-    token_data: TokenRefresh,
-    db: Session = Depends(get_db)
-):
-    tokens = AuthService.refresh_access_token(token_data.refresh_token, db)
+@router.post("/refresh", response_model=TokenResponse)
+async def refresh_token(token_data: TokenRefresh):
+    await _reject_revoked(token_data.refresh_token)
+    tokens = await AuthService.refresh_access_token(token_data.refresh_token)
     return tokens
 
 
 @router.get("/me")
 async def get_current_user_info(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     token = credentials.credentials
-    user = AuthService.get_current_user(token, db)
+    await _reject_revoked(token)
+    user = await AuthService.get_current_user(token, db)
     return {
         "id": user.id,
         "email": user.email,
@@ -51,9 +66,48 @@ async def get_current_user_info(
     }
 
 
-def get_current_user(
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    token_data: Optional[TokenLogout] = None,
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    """Revoke the current access token and, if given, its refresh token"""
+    payload = await _reject_revoked(credentials.credentials)
+    if not payload or payload.get("type") != "access":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid access token"
+        )
+    await revocation_store.revoke(payload)
+
+    if token_data and token_data.refresh_token:
+        refresh_payload = decode_token(token_data.refresh_token)
+        if (
+            refresh_payload
+            and refresh_payload.get("type") == "refresh"
+            and refresh_payload.get("sub") == payload.get("sub")
+        ):
+            await revocation_store.revoke(refresh_payload)
+            await refresh_token_store.revoke_family(refresh_payload.get("fam"))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post("/revoke-all", status_code=status.HTTP_204_NO_CONTENT)
+async def revoke_all(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """Log the user out everywhere by invalidating every token issued so far"""
+    payload = await _reject_revoked(credentials.credentials)
+    if not payload or payload.get("type") != "access":
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid access token"
+        )
+    await revocation_store.revoke_all(int(payload["sub"]))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
     token = credentials.credentials
-    return AuthService.get_current_user(token, db)
+    return await AuthService.get_current_user(token, db)
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, status
 from fastapi.responses import JSONResponse
-from app.core.database import engine
+from app.core.database import async_engine
 from sqlalchemy import text
 
 router = APIRouter()
@@ -9,8 +9,8 @@ router = APIRouter()
 @router.get("/")
 async def health_check():
     try:
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
         return {"status": "healthy", "service": "auth-service"}
     except Exception as e:
         return JSONResponse(
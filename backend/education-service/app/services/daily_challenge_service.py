@@ -168,7 +168,7 @@ class DailyChallengeService:
                 async with httpx.AsyncClient() as client:
                     await client.post(
                         f"{settings.USER_SERVICE_URL}/api/v1/users/xp",
-                        headers={"Authorization": f"Bearer {token}"},
+                        headers={"Authorization": f"Bearer {token}", "Idempotency-Key": f"daily_challenge:{user_challenge.id}"},
                         json={"xp": challenge.xp_reward},
                         timeout=5.0
                     )
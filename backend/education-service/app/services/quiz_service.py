@@ -140,9 +140,10 @@ class QuizService:
             xp_earned = quiz.xp_reward
             try:
                 async with httpx.AsyncClient() as client:
+                    # A quiz is completed once per user, so retries award once
                     await client.post(
                         f"{settings.USER_SERVICE_URL}/api/v1/users/xp",
-                        headers={"Authorization": f"Bearer {token}"},
+                        headers={"Authorization": f"Bearer {token}", "Idempotency-Key": f"quiz_completed:{quiz_id}"},
                         json={"xp": xp_earned},
                         timeout=5.0
                     )
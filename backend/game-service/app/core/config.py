@@ -11,6 +11,24 @@ class Settings(BaseSettings):
     ANALYTICS_SERVICE_URL: str = "http://analytics-service:8000"
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8000"]
     ENVIRONMENT: str = "development"
+    # Shared with the API gateway to verify the X-Internal-Identity header
+    INTERNAL_AUTH_SECRET: str = ""
+    # "remote" asks the user/auth service; "local" decodes the JWT with the
+    # shared key. AUTH_REVOCATION_CHECK adds one Redis round trip per request
+    # to honour logouts (auth-service revocation list and token generations)
+    AUTH_VERIFY_MODE: str = "remote"
+    AUTH_REVOCATION_CHECK: bool = True
+    JWT_SECRET_KEY: str = ""
+    JWT_ALGORITHM: str = "HS256"
+    # Cache of verify_token results; "redis" shares it between replicas
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_BACKEND: str = "memory"
+    TOKEN_CACHE_TTL: int = 300
+    TOKEN_CACHE_NEGATIVE_TTL: int = 10
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    # Redis stream carrying user events (xp_added, goal_completed, ...)
+    EVENTS_STREAM: str = "user_events"
+    EVENTS_STREAM_MAXLEN: int = 100000
     SAVINGS_INTEREST_RATE: float = 0.05
 
     class Config:
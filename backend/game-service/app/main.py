@@ -5,6 +5,7 @@ import logging
 import traceback
 
 from app.core.config import settings
+from app.core.responses import FastJSONResponse
 from app.routers import budget, savings, health, category
 
 logging.basicConfig(level=logging.INFO)
@@ -15,6 +16,7 @@ app = FastAPI(
     title="Game Service",
     description="Game scenarios and logic service",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(
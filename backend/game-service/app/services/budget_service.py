@@ -1,5 +1,6 @@
 import httpx
 import logging
+import uuid
 from decimal import Decimal
 from app.core.config import settings
 from app.schemas.budget import BudgetPlanRequest, BudgetCategory
@@ -37,26 +38,31 @@ class BudgetService:
 
         # Планирование бюджета - это только создание плана, не изменение баланса
         # Баланс будет изменяться только при реальных операциях (получение дохода, траты)
+        # The event and the HTTP fallback carry the same key, so user-service
+        # awards the XP once even if a retried event and the fallback both land
+        xp_key = f"budget_planned:{uuid.uuid4().hex}"
         async with httpx.AsyncClient() as client:
             try:
                 # Publish event for XP addition (event-based)
                 from app.core.events import event_publisher
-                await event_publisher.publish(
+                published = await event_publisher.publish(
                     'budget_planned',
                     user_id,
-                    {'xp_reward': xp_reward, 'success': success}
+                    {'xp_reward': xp_reward, 'success': success},
+                    event_id=xp_key
                 )
                 
-                # Fallback: direct HTTP call if event publishing fails
-                try:
-                    xp_response = await client.post(
-                        f"{settings.USER_SERVICE_URL}/api/v1/users/xp",
-                        headers={"Authorization": f"Bearer {token}"},
-                        json={"xp": xp_reward},
-                        timeout=5.0
-                    )
-                except Exception:
-                    pass  # Event-based approach is primary
+                # Fallback: direct HTTP call only if the event was not stored
+                if not published:
+                    try:
+                        xp_response = await client.post(
+                            f"{settings.USER_SERVICE_URL}/api/v1/users/xp",
+                            headers={"Authorization": f"Bearer {token}", "Idempotency-Key": xp_key},
+                            json={"xp": xp_reward},
+                            timeout=5.0
+                        )
+                    except Exception:
+                        pass  # Event-based approach is primary
 
                 # Создаем транзакцию только для записи плана (не меняет баланс)
                 try:
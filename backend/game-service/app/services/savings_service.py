@@ -123,18 +123,23 @@ class SavingsService:
 
             try:
                 from app.core.events import event_publisher
-                await event_publisher.publish(
+                # A goal completes once; the key makes the event and the HTTP
+                # fallback below a single award
+                xp_key = f"goal_completed:{goal.id}"
+                published = await event_publisher.publish(
                     "goal_completed",
                     user_id,
-                    {"xp_reward": SavingsService.XP_REWARD_GOAL_COMPLETED, "goal_id": goal.id}
+                    {"xp_reward": SavingsService.XP_REWARD_GOAL_COMPLETED, "goal_id": goal.id},
+                    event_id=xp_key
                 )
                 async with httpx.AsyncClient() as client:
-                    await client.post(
-                        f"{settings.USER_SERVICE_URL}/api/v1/users/xp",
-                        headers={"Authorization": f"Bearer {token}"},
-                        json={"xp": SavingsService.XP_REWARD_GOAL_COMPLETED},
-                        timeout=5.0
-                    )
+                    if not published:
+                        await client.post(
+                            f"{settings.USER_SERVICE_URL}/api/v1/users/xp",
+                            headers={"Authorization": f"Bearer {token}", "Idempotency-Key": xp_key},
+                            json={"xp": SavingsService.XP_REWARD_GOAL_COMPLETED},
+                            timeout=5.0
+                        )
                     # Create transaction for goal completion
                     try:
                         await client.post(
@@ -260,18 +265,23 @@ class SavingsService:
 
             try:
                 from app.core.events import event_publisher
-                await event_publisher.publish(
+                # A goal completes once; the key makes the event and the HTTP
+                # fallback below a single award
+                xp_key = f"goal_completed:{goal.id}"
+                published = await event_publisher.publish(
                     "goal_completed",
                     user_id,
-                    {"xp_reward": SavingsService.XP_REWARD_GOAL_COMPLETED, "goal_id": goal.id}
+                    {"xp_reward": SavingsService.XP_REWARD_GOAL_COMPLETED, "goal_id": goal.id},
+                    event_id=xp_key
                 )
                 async with httpx.AsyncClient() as client:
-                    await client.post(
-                        f"{settings.USER_SERVICE_URL}/api/v1/users/xp",
-                        headers={"Authorization": f"Bearer {token}"},
-                        json={"xp": SavingsService.XP_REWARD_GOAL_COMPLETED},
-                        timeout=5.0
-                    )
+                    if not published:
+                        await client.post(
+                            f"{settings.USER_SERVICE_URL}/api/v1/users/xp",
+                            headers={"Authorization": f"Bearer {token}", "Idempotency-Key": xp_key},
+                            json={"xp": SavingsService.XP_REWARD_GOAL_COMPLETED},
+                            timeout=5.0
+                        )
                     # Create transaction for goal completion
                     try:
                         await client.post(
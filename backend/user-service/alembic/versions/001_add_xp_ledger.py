@@ -0,0 +1,42 @@
+"""Add XP ledger
+
+Revision ID: 001_xp_ledger
+Revises: 
+Create Date: 2026-10-17 00:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '001_xp_ledger'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # users itself is created by auth-service's migrations
+    op.create_table(
+        'xp_ledger',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('amount', sa.Integer(), nullable=False),
+        sa.Column('source', sa.String(), nullable=False),
+        sa.Column('idempotency_key', sa.String(), nullable=True),
+        sa.Column('folded', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'idempotency_key', name='uq_xp_ledger_user_key')
+    )
+    # Matches the NOT folded filter used by pending-XP reads and the fold
+    op.create_index(
+        'ix_xp_ledger_unfolded', 'xp_ledger', ['user_id'],
+        unique=False, postgresql_where=sa.text('NOT folded')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_xp_ledger_unfolded', table_name='xp_ledger')
+    op.drop_table('xp_ledger')
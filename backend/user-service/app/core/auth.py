@@ -1,9 +1,60 @@
+import base64
+import hashlib
+import hmac
+import json
+import time
+from typing import Optional
+
 import httpx
+from jose import JWTError, jwt
 from fastapi import HTTPException, status
 from app.core.config import settings
+from app.core.revocation import revocation_store
+from app.core.token_cache import token_cache, unverified_claims
+
+
+def decode_access_token(token: str) -> Optional[dict]:
+    """Verify an access token locally with the key shared with auth-service"""
+    if not settings.JWT_SECRET_KEY:
+        return None
+    try:
+        payload = jwt.decode(
+            token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
+        )
+    except JWTError:
+        return None
+    if payload.get("type") != "access" or not payload.get("sub"):
+        return None
+    return payload
 
 
 async def verify_token(token: str) -> dict:
+    if settings.AUTH_VERIFY_MODE == "local":
+        claims = decode_access_token(token)
+        if claims is None or await revocation_store.is_revoked(claims):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token"
+            )
+        return {"id": int(claims["sub"]), "email": claims.get("email")}
+
+    found, user_data = await token_cache.get(token)
+    if found:
+        # A cached result may predate a logout, so revocation is checked every time
+        if user_data is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token"
+            )
+        if await revocation_store.is_revoked(unverified_claims(token)):
+            # Replace the cached result so the token stays rejected
+            await token_cache.set_invalid(token)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token"
+            )
+        return user_data
+
     async with httpx.AsyncClient() as client:
         try:
             response = await client.get(
@@ -12,14 +63,46 @@ async def verify_token(token: str) -> dict:
                 timeout=5.0
             )
             if response.status_code == 200:
-                return response.json()
-            else:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid token"
-                )
+                user_data = response.json()
+                await token_cache.set_valid(token, user_data)
+                return user_data
+            if response.status_code in (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN):
+                await token_cache.set_invalid(token)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid token"
+            )
         except httpx.RequestError:
             raise HTTPException(
                 status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
                 detail="Auth service unavailable"
             )
+
+
+def verify_identity_header(value: Optional[str]) -> Optional[dict]:
+    """Return the identity forwarded by the API gateway if its signature is valid"""
+    if not value or not settings.INTERNAL_AUTH_SECRET:
+        return None
+    try:
+        encoded, signature = value.rsplit(".", 1)
+    except ValueError:
+        return None
+    expected = hmac.new(
+        settings.INTERNAL_AUTH_SECRET.encode(), encoded.encode(), hashlib.sha256
+    ).hexdigest()
+    if not hmac.compare_digest(signature, expected):
+        return None
+    try:
+        identity = json.loads(base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4)))
+    except ValueError:
+        return None
+    if identity.get("exp", 0) <= time.time():
+        return None
+    return identity
+
+
+def is_admin_token(token: str) -> bool:
+    """True for the admin-service key (ADMIN_SECRET_KEY); never when it is unset"""
+    if not settings.ADMIN_SECRET_KEY:
+        return False
+    return hmac.compare_digest(token.encode(), settings.ADMIN_SECRET_KEY.encode())
@@ -8,6 +8,52 @@ class Settings(BaseSettings):
     AUTH_SERVICE_URL: str = "http://auth-service:8000"
     CORS_ORIGINS: List[str] = ["http://localhost:3000", "http://localhost:8000"]
     ENVIRONMENT: str = "development"
+    # Shared with the API gateway to verify the X-Internal-Identity header
+    INTERNAL_AUTH_SECRET: str = ""
+    # "remote" asks the user/auth service; "local" decodes the JWT with the
+    # shared key. AUTH_REVOCATION_CHECK adds one Redis round trip per request
+    # to honour logouts (auth-service revocation list and token generations)
+    AUTH_VERIFY_MODE: str = "remote"
+    AUTH_REVOCATION_CHECK: bool = True
+    JWT_SECRET_KEY: str = ""
+    JWT_ALGORITHM: str = "HS256"
+    # Cache of verify_token results; "redis" shares it between replicas
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_BACKEND: str = "memory"
+    TOKEN_CACHE_TTL: int = 300
+    TOKEN_CACHE_NEGATIVE_TTL: int = 10
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    # Redis stream carrying user events (xp_added, goal_completed, ...)
+    EVENTS_STREAM: str = "user_events"
+    EVENTS_STREAM_MAXLEN: int = 100000
+    # Consumer group shared by all replicas; each replica needs its own
+    # consumer name (defaults to the hostname). Entries left unacknowledged for
+    # EVENTS_CLAIM_IDLE_MS are retried by another consumer, and moved to
+    # EVENTS_DEAD_LETTER_STREAM after EVENTS_MAX_DELIVERIES attempts
+    EVENTS_CONSUMER_GROUP: str = "user-service"
+    EVENTS_CONSUMER_NAME: str = ""
+    # Events are applied in batches of up to EVENTS_READ_COUNT, collected for
+    # at most EVENTS_BATCH_MAX_WAIT_MS after the first one arrives
+    EVENTS_READ_COUNT: int = 100
+    EVENTS_BATCH_MAX_WAIT_MS: int = 50
+    EVENTS_BLOCK_MS: int = 1000
+    EVENTS_CLAIM_IDLE_MS: int = 60000
+    EVENTS_MAX_DELIVERIES: int = 5
+    EVENTS_DEAD_LETTER_STREAM: str = "user_events:dead"
+    # Most ids accepted by POST /users/batch
+    USER_BATCH_MAX_IDS: int = 100
+    # admin-service key; callers presenting it to /users/batch may read every
+    # user's email and balance. Empty disables the admin path
+    ADMIN_SECRET_KEY: str = ""
+    # XP awards are appended to xp_ledger and folded into users.xp by a
+    # background task every XP_LEDGER_FOLD_INTERVAL seconds
+    XP_LEDGER_FOLD_INTERVAL: float = 2.0
+    XP_LEDGER_FOLD_BATCH: int = 1000
+    # In-process cache of /users/me profiles; writes invalidate it on every
+    # replica through Redis pub/sub, the TTL bounds staleness if one is missed
+    PROFILE_CACHE_ENABLED: bool = True
+    PROFILE_CACHE_TTL: float = 30.0
+    PROFILE_CACHE_MAX_ENTRIES: int = 10000
     LOG_LEVEL: str = "INFO"
 
     class Config:
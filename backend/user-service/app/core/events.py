@@ -1,5 +1,7 @@
 import json
 import logging
+import time
+import uuid
 try:
     import redis.asyncio as redis
 except ImportError:
@@ -11,7 +13,12 @@ logger = logging.getLogger(__name__)
 
 
 class EventPublisher:
-    """Publish events to Redis pub/sub"""
+    """Publish events to a Redis stream.
+
+    Entries stay in the stream until a consumer group has acknowledged them,
+    so events published while no consumer is running are not lost. The
+    stream is capped at roughly EVENTS_STREAM_MAXLEN entries.
+    """
     
     def __init__(self):
         self.redis_client: Optional[redis.Redis] = None
@@ -26,23 +33,35 @@ class EventPublisher:
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
 
-    async def publish(self, event_type: str, user_id: int, data: dict):
-        """Publish an event"""
+    async def publish(self, event_type: str, user_id: int, data: dict, event_id: Optional[str] = None) -> bool:
+        """Publish an event; True once Redis has stored it.
+
+        event_id identifies the event for deduplication. Pass the same id as
+        the Idempotency-Key of any HTTP fallback for the same action.
+        """
         if not self.redis_client:
             await self.connect()
 
         event = {
+            'event_id': event_id or uuid.uuid4().hex,
             'type': event_type,
             'user_id': user_id,
-            'data': data,
-            'timestamp': None  # Will be set by receiver if needed
+            'timestamp': time.time(),
+            'data': data
         }
 
         try:
-            await self.redis_client.publish('user_events', json.dumps(event))
+            await self.redis_client.xadd(
+                settings.EVENTS_STREAM,
+                {'event': json.dumps(event)},
+                maxlen=settings.EVENTS_STREAM_MAXLEN,
+                approximate=True
+            )
             logger.info(f"Published event: {event_type} for user {user_id}")
+            return True
         except Exception as e:
             logger.error(f"Failed to publish event: {e}")
+            return False
 
     async def close(self):
         """Close Redis connection"""
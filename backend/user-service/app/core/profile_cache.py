@@ -0,0 +1,138 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = "user_profile_invalidations"
+
+
+class ProfileCache:
+    """In-process TTL + LRU cache of user profiles, keyed by user id.
+
+    Writes invalidate the local entry right away and publish the user id on
+    Redis so other replicas drop theirs too. PROFILE_CACHE_TTL bounds how
+    stale an entry can get if an invalidation message is missed.
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[int, Tuple[float, Any]]" = OrderedDict()
+        # Bumped on every invalidation; a load that started before one is not stored
+        self._versions: Dict[int, int] = {}
+        self._pending: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+        self.redis_client = None
+        self.running = False
+
+    @property
+    def enabled(self) -> bool:
+        return settings.PROFILE_CACHE_ENABLED
+
+    def _client(self):
+        if self.redis_client is None:
+            if redis is None:
+                raise RuntimeError("redis package is not installed")
+            self.redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        return self.redis_client
+
+    def version(self, user_id: int) -> int:
+        return self._versions.get(user_id, 0)
+
+    def get(self, user_id: int) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        expires_at, profile = entry
+        if expires_at <= time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return profile
+
+    def set(self, user_id: int, profile: Any, version: int):
+        """Store a profile loaded while the user's version was `version`"""
+        if not self.enabled or self.version(user_id) != version:
+            return
+        self._entries[user_id] = (time.monotonic() + settings.PROFILE_CACHE_TTL, profile)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > settings.PROFILE_CACHE_MAX_ENTRIES:
+            self._entries.popitem(last=False)
+
+    def _drop(self, user_id: int):
+        self._versions[user_id] = self.version(user_id) + 1
+        self._entries.pop(user_id, None)
+
+    def invalidate(self, user_id: int):
+        """Drop the user's profile here and, in the background, on other replicas"""
+        self._drop(user_id)
+        if not self.enabled:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # Not on the event loop (e.g. a worker thread): TTL covers the rest
+            return
+        task = loop.create_task(self._publish(user_id))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _publish(self, user_id: int):
+        try:
+            await self._client().publish(INVALIDATION_CHANNEL, str(user_id))
+        except Exception as e:
+            logger.warning(f"Profile invalidation publish failed: {e}")
+
+    async def listen(self):
+        """Apply invalidations published by other replicas"""
+        while self.running:
+            pubsub = None
+            try:
+                pubsub = self._client().pubsub()
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Anything published while we were not subscribed is lost
+                self._entries.clear()
+                while self.running:
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+                    if message:
+                        self._drop(int(message["data"]))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Profile invalidation listener failed: {e}")
+                self._entries.clear()
+                await asyncio.sleep(1.0)
+            finally:
+                if pubsub is not None:
+                    try:
+                        await pubsub.close()
+                    except Exception:
+                        pass
+
+    def start(self):
+        if not self.enabled:
+            return
+        self.running = True
+        self._task = asyncio.create_task(self.listen())
+
+    async def stop(self):
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+profile_cache = ProfileCache()
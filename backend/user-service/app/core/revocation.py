@@ -0,0 +1,80 @@
+import logging
+import time
+from typing import Optional
+
+try:
+    import redis.asyncio as redis
+except ImportError:
+    redis = None
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+REVOKED_KEY = "auth:revoked:{jti}"
+GENERATION_KEY = "auth:gen:{user_id}"
+
+
+class RevocationStore:
+    """Redis-backed token revocation.
+
+    A single token is revoked by its jti, kept only until the token would have
+    expired anyway. Revoking all of a user's tokens bumps their generation
+    counter; tokens carry the generation they were issued under in the "gen"
+    claim, so anything older than the current value is rejected.
+    """
+
+    def __init__(self):
+        self.redis_client = None
+
+    def _client(self):
+        if self.redis_client is None:
+            if redis is None:
+                raise RuntimeError("redis package is not installed")
+            self.redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        return self.redis_client
+
+    async def is_revoked(self, claims: dict) -> bool:
+        """Check a decoded token in one pipelined round trip"""
+        if not settings.AUTH_REVOCATION_CHECK:
+            return False
+        jti = claims.get("jti")
+        user_id = claims.get("sub")
+        try:
+            async with self._client().pipeline(transaction=False) as pipe:
+                pipe.get(GENERATION_KEY.format(user_id=user_id))
+                if jti:
+                    pipe.exists(REVOKED_KEY.format(jti=jti))
+                generation, *revoked = await pipe.execute()
+        except Exception as e:
+            # Fail open: an unreachable Redis must not log everyone out
+            logger.warning(f"Revocation check failed: {e}")
+            return False
+        if revoked and revoked[0]:
+            return True
+        return int(generation or 0) > int(claims.get("gen", 0))
+
+    async def revoke(self, claims: dict):
+        """Revoke one token until its exp"""
+        jti = claims.get("jti")
+        if not jti:
+            return
+        ttl = int(claims.get("exp", 0) - time.time())
+        if ttl > 0:
+            await self._client().set(REVOKED_KEY.format(jti=jti), "1", ex=ttl)
+
+    async def revoke_all(self, user_id: int) -> int:
+        """Invalidate every token issued to the user so far"""
+        return await self._client().incr(GENERATION_KEY.format(user_id=user_id))
+
+    async def generation(self, user_id: int) -> int:
+        """Current generation to embed in newly issued tokens"""
+        try:
+            value: Optional[str] = await self._client().get(GENERATION_KEY.format(user_id=user_id))
+        except Exception as e:
+            logger.warning(f"Could not read token generation: {e}")
+            return 0
+        return int(value or 0)
+
+
+revocation_store = RevocationStore()
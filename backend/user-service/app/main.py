@@ -6,8 +6,11 @@ import logging
 import uuid
 
 from app.core.config import settings
-from app.routers import user, health
+from app.core.profile_cache import profile_cache
+from app.core.responses import FastJSONResponse
+from app.routers import user, health, metrics
 from app.services.event_listener import event_listener
+from app.services.xp_ledger import xp_aggregator
 
 # Configure structured logging
 correlation_id_ctx: ContextVar[str] = ContextVar("correlation_id", default="-")
@@ -32,6 +35,8 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting user-service")
+    xp_aggregator.start()
+    profile_cache.start()
     try:
         # Start event listener in background
         import asyncio
@@ -45,12 +50,15 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down user-service")
     await event_listener.stop()
+    await xp_aggregator.stop()
+    await profile_cache.stop()
 
 
 app = FastAPI(
     title="User Service",
     description="User management service",
     version="1.0.0",
+    default_response_class=FastJSONResponse,
     lifespan=lifespan,
 )
 
@@ -80,6 +88,7 @@ async def add_correlation_id(request: Request, call_next):
 
 app.include_router(health.router, prefix="/health", tags=["health"])
 app.include_router(user.router, prefix="/api/v1/users", tags=["users"])
+app.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
 
 
 @app.get("/")
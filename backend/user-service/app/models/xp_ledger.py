@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.sql import func, false, text
+from app.core.database import Base
+
+
+class XPLedgerEntry(Base):
+    """One XP award. Rows are only appended, then marked folded once the
+    aggregator has added them to users.xp."""
+    __tablename__ = "xp_ledger"
+    __table_args__ = (
+        # Same key from the event and the HTTP fallback is awarded once
+        UniqueConstraint("user_id", "idempotency_key", name="uq_xp_ledger_user_key"),
+        Index("ix_xp_ledger_unfolded", "user_id", postgresql_where=text("NOT folded")),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    amount = Column(Integer, nullable=False)
+    source = Column(String, nullable=False)
+    idempotency_key = Column(String, nullable=True)
+    folded = Column(Boolean, default=False, server_default=false(), nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
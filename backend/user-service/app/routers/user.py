@@ -1,17 +1,23 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Header
 from sqlalchemy.orm import Session
-from typing import Optional
+from typing import Optional, Tuple
 
 from app.core.database import get_db
-from app.core.auth import verify_token
+from app.core.auth import verify_token, verify_identity_header, is_admin_token
 from app.services.user_service import UserService
-from app.schemas.user import UserResponse, UserUpdate, BalanceUpdate, XPUpdate, LevelResponse
+from app.services.xp_ledger import XPLedgerService
+from app.core.config import settings
+from app.schemas.user import (
+    UserResponse, UserUpdate, BalanceUpdate, XPUpdate, LevelResponse,
+    UserBatchRequest, UserBatchResponse, UserSummaryResponse,
+)
 
 router = APIRouter()
 
 
 async def get_current_user_id(
     authorization: Optional[str] = Header(None),
+    x_internal_identity: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ) -> int:
     if not authorization or not authorization.startswith("Bearer "):
@@ -20,17 +26,37 @@ async def get_current_user_id(
             detail="Missing or invalid authorization header"
         )
     token = authorization.split(" ")[1]
-    user_data = await verify_token(token)
+    user_data = verify_identity_header(x_internal_identity) or await verify_token(token)
     return user_data["id"]
 
 
+async def get_batch_requester(
+    authorization: Optional[str] = Header(None),
+    x_internal_identity: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+) -> Tuple[Optional[int], bool]:
+    """(user id, is admin) for /batch; admin-service sends its key as the bearer token"""
+    if authorization and authorization.startswith("Bearer ") and is_admin_token(authorization.split(" ")[1]):
+        return None, True
+    return await get_current_user_id(authorization, x_internal_identity, db), False
+
+
 @router.get("/me", response_model=UserResponse)
 async def get_current_user(
     user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
-    user = UserService.get_user_by_id(db, user_id)
-    return user
+    return UserService.get_profile(db, user_id)
+
+
+@router.get("/me/summary", response_model=UserSummaryResponse)
+async def get_current_user_summary(
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    """Profile and level info in one response"""
+    profile = UserService.get_profile(db, user_id)
+    return {"profile": profile, "level": UserService.calculate_level_info(profile.xp)}
 
 
 @router.put("/me", response_model=UserResponse)
@@ -40,7 +66,32 @@ async def update_current_user(
     db: Session = Depends(get_db)
 ):
     user = UserService.update_user(db, user_id, user_update)
-    return user
+    return UserService.to_response(db, user)
+
+
+@router.post("/batch", response_model=UserBatchResponse)
+async def get_users_batch(
+    batch_request: UserBatchRequest,
+    requester: Tuple[Optional[int], bool] = Depends(get_batch_requester),
+    db: Session = Depends(get_db)
+):
+    """Look up many users at once (leaderboards, admin views, notifications).
+
+    With the admin key (admin-service) every field of every user can be
+    requested, and all of them are returned by default. A signed-in user gets
+    id, username, level and xp; asking for email, balance or created_at of
+    anyone but themselves is rejected with 403.
+    """
+    if len(batch_request.ids) > settings.USER_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"At most {settings.USER_BATCH_MAX_IDS} ids per request"
+        )
+    requester_id, admin = requester
+    users, missing = UserService.get_users_by_ids(
+        db, batch_request.ids, batch_request.fields, requester_id=requester_id, admin=admin
+    )
+    return {"users": users, "missing": missing}
 
 
 @router.get("/{user_id}", response_model=UserResponse)
@@ -54,8 +105,7 @@ async def get_user(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to access this user"
         )
-    user = UserService.get_user_by_id(db, user_id)
-    return user
+    return UserService.get_profile(db, user_id)
 
 
 @router.post("/balance", response_model=UserResponse)
@@ -65,17 +115,24 @@ async def update_balance(
     db: Session = Depends(get_db)
 ):
     user = UserService.update_balance(db, user_id, balance_update)
-    return user
+    return UserService.to_response(db, user)
 
 
 @router.post("/xp", response_model=UserResponse)
 async def add_xp(
     xp_update: XPUpdate,
     user_id: int = Depends(get_current_user_id),
+    idempotency_key: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
-    user = UserService.add_xp(db, user_id, xp_update)
-    return user
+    """Record an XP award in the ledger.
+
+    Services that also publish an event for the same award send the same
+    Idempotency-Key on both paths, so it is only counted once.
+    """
+    XPLedgerService.record(db, user_id, xp_update.xp, "api", idempotency_key)
+    user = UserService.get_user_by_id(db, user_id)
+    return UserService.to_response(db, user)
 
 
 @router.get("/me/level", response_model=LevelResponse)
@@ -83,6 +140,6 @@ async def get_level_info(
     user_id: int = Depends(get_current_user_id),
     db: Session = Depends(get_db)
 ):
-    user = UserService.get_user_by_id(db, user_id)
-    level_info = UserService.calculate_level_info(user.xp)
+    profile = UserService.get_profile(db, user_id)
+    level_info = UserService.calculate_level_info(profile.xp)
     return level_info
@@ -1,6 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 from decimal import Decimal
+from typing import Any, Dict, List, Literal, Optional
+
+UserField = Literal["id", "email", "username", "level", "xp", "balance", "created_at"]
 
 
 class UserResponse(BaseModel):
@@ -32,3 +35,19 @@ class LevelResponse(BaseModel):
     level: int
     xp: int
     xp_to_next_level: int
+
+
+class UserSummaryResponse(BaseModel):
+    profile: UserResponse
+    level: LevelResponse
+
+
+class UserBatchRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1)
+    # Columns to return; all of them when omitted
+    fields: Optional[List[UserField]] = None
+
+
+class UserBatchResponse(BaseModel):
+    users: List[Dict[str, Any]]
+    missing: List[int]
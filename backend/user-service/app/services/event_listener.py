@@ -1,25 +1,66 @@
 import asyncio
 import json
 import logging
+import socket
+import time
 try:
     import redis.asyncio as redis
 except ImportError:
     import aioredis as redis
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
+from prometheus_client import Counter, Histogram
 from app.core.config import settings
+from app.core.profile_cache import profile_cache
 from app.core.database import SessionLocal
-from app.services.user_service import UserService
+from app.services.xp_ledger import XPLedgerService
 
 logger = logging.getLogger(__name__)
 
+# Event types that award XP, and the data field holding the amount
+XP_EVENT_FIELDS = {
+    'xp_added': 'xp',
+    'goal_completed': 'xp_reward',
+    'budget_planned': 'xp_reward',
+}
+
+EVENTS_PROCESSED = Counter(
+    "user_events_processed_total",
+    "Stream entries processed by the event listener",
+    ["outcome"],
+)
+BATCH_SIZE = Histogram(
+    "user_events_batch_size",
+    "Events applied per batch",
+    buckets=(1, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+BATCH_DURATION = Histogram(
+    "user_events_batch_seconds",
+    "Time to apply and acknowledge one batch of events",
+)
+EVENT_LAG = Histogram(
+    "user_events_lag_seconds",
+    "Time from an event being published to it being handled",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+
 
 class EventListener:
+    """Consume user events from a Redis stream through a consumer group.
+
+    Every replica joins the same group, so each event is handled by one of
+    them. Entries are acknowledged only after they were handled; whatever a
+    crashed or failing consumer leaves pending is claimed again once idle for
+    EVENTS_CLAIM_IDLE_MS, and moved to the dead-letter stream after
+    EVENTS_MAX_DELIVERIES attempts. Delivery is at-least-once.
+    """
+
     def __init__(self):
         self.redis_client: Optional[redis.Redis] = None
         self.running = False
+        self.consumer_name = settings.EVENTS_CONSUMER_NAME or socket.gethostname()
 
     async def connect(self):
-        """Connect to Redis"""
+        """Connect to Redis and make sure the consumer group exists"""
         try:
             self.redis_client = await redis.from_url(
                 settings.REDIS_URL,
@@ -29,6 +70,15 @@ class EventListener:
         except Exception as e:
             logger.error(f"Failed to connect to Redis: {e}")
             raise
+        try:
+            # Start from the beginning so events published before the group
+            # existed are still handled
+            await self.redis_client.xgroup_create(
+                settings.EVENTS_STREAM, settings.EVENTS_CONSUMER_GROUP, id="0", mkstream=True
+            )
+        except redis.ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
 
     async def disconnect(self):
         """Disconnect from Redis"""
@@ -37,68 +87,195 @@ class EventListener:
             logger.info("Disconnected from Redis")
 
     async def listen_for_events(self):
-        """Listen for events from Redis pub/sub"""
+        """Read batches of events from the stream until stopped"""
         if not self.redis_client:
             await self.connect()
 
-        pubsub = self.redis_client.pubsub()
-        await pubsub.subscribe('user_events')
-
-        logger.info("Started listening for user events")
+        logger.info(f"Started listening for user events as {self.consumer_name}")
 
+        last_reclaim = 0.0
         try:
             while self.running:
-                message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
-                if message:
-                    try:
-                        event_data = json.loads(message['data'])
-                        await self.handle_event(event_data)
-                    except json.JSONDecodeError as e:
-                        logger.error(f"Failed to parse event data: {e}")
-                    except Exception as e:
-                        logger.error(f"Error handling event: {e}", exc_info=True)
+                try:
+                    now = time.monotonic()
+                    if now - last_reclaim >= settings.EVENTS_CLAIM_IDLE_MS / 1000:
+                        last_reclaim = now
+                        await self.reclaim_pending()
+
+                    messages = await self.read_batch()
+                    if messages:
+                        await self.process_messages(messages)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Error reading events: {e}", exc_info=True)
+                    await asyncio.sleep(1.0)
         except asyncio.CancelledError:
             logger.info("Event listener cancelled")
-        finally:
-            await pubsub.unsubscribe('user_events')
-            await pubsub.close()
 
-    async def handle_event(self, event_data: dict):
-        """Handle incoming event"""
-        event_type = event_data.get('type')
-        user_id = event_data.get('user_id')
-        data = event_data.get('data', {})
+    async def _read(self, count: int, block_ms: int) -> List[Tuple[str, dict]]:
+        response = await self.redis_client.xreadgroup(
+            settings.EVENTS_CONSUMER_GROUP,
+            self.consumer_name,
+            {settings.EVENTS_STREAM: ">"},
+            count=count,
+            block=block_ms
+        )
+        return [message for _stream, messages in response or [] for message in messages]
 
-        logger.info(f"Received event: {event_type} for user {user_id}")
+    async def read_batch(self) -> List[Tuple[str, dict]]:
+        """Wait for events, then keep draining until EVENTS_READ_COUNT entries
+        or EVENTS_BATCH_MAX_WAIT_MS have passed since the first one"""
+        messages = await self._read(settings.EVENTS_READ_COUNT, settings.EVENTS_BLOCK_MS)
+        if not messages:
+            return messages
+        deadline = time.monotonic() + settings.EVENTS_BATCH_MAX_WAIT_MS / 1000
+        while len(messages) < settings.EVENTS_READ_COUNT:
+            remaining_ms = int((deadline - time.monotonic()) * 1000)
+            if remaining_ms <= 0:
+                break
+            more = await self._read(settings.EVENTS_READ_COUNT - len(messages), remaining_ms)
+            if not more:
+                break
+            messages.extend(more)
+        return messages
 
-        db = SessionLocal()
-        try:
-            if event_type == 'xp_added':
-                xp_amount = data.get('xp', 0)
-                if xp_amount > 0:
-                    from app.schemas.user import XPUpdate
-                    UserService.add_xp(db, user_id, XPUpdate(xp=xp_amount))
-                    logger.info(f"Added {xp_amount} XP to user {user_id}")
-
-            elif event_type == 'goal_completed':
-                xp_reward = data.get('xp_reward', 0)
-                if xp_reward > 0:
-                    from app.schemas.user import XPUpdate
-                    UserService.add_xp(db, user_id, XPUpdate(xp=xp_reward))
-                    logger.info(f"Added {xp_reward} XP for goal completion to user {user_id}")
-
-            elif event_type == 'budget_planned':
-                xp_reward = data.get('xp_reward', 0)
-                if xp_reward > 0:
-                    from app.schemas.user import XPUpdate
-                    UserService.add_xp(db, user_id, XPUpdate(xp=xp_reward))
-                    logger.info(f"Added {xp_reward} XP for budget planning to user {user_id}")
+    async def process_messages(self, messages: List[Tuple[str, dict]]):
+        """Handle a batch of stream entries and acknowledge the handled ones.
+
+        The whole batch is applied in one transaction; if that fails the
+        entries are retried one by one so a single bad event does not hold
+        back the others.
+        """
+        started = time.perf_counter()
+        now = time.time()
+        events = []
+        for message_id, fields in messages:
+            try:
+                event_data = json.loads(fields["event"])
+            except (KeyError, TypeError, json.JSONDecodeError) as e:
+                logger.error(f"Failed to parse event {message_id}: {e}")
+                await self.dead_letter(message_id, fields, f"unparseable: {e}")
+                continue
+            # Stream ids start with the XADD time in milliseconds
+            EVENT_LAG.observe(max(0.0, now - int(message_id.split("-")[0]) / 1000))
+            events.append((message_id, event_data))
+        if not events:
+            return
 
+        handled = []
+        try:
+            totals = await asyncio.to_thread(self.apply_events, [event for _, event in events])
+            self._invalidate(totals)
+            handled = [message_id for message_id, _ in events]
         except Exception as e:
-            logger.error(f"Error processing event {event_type}: {e}", exc_info=True)
+            logger.warning(f"Batch of {len(events)} events failed, retrying one by one: {e}")
+            for message_id, event_data in events:
+                try:
+                    await self.handle_event(event_data)
+                    handled.append(message_id)
+                except Exception as exc:
+                    # Left pending: retried after EVENTS_CLAIM_IDLE_MS
+                    logger.error(f"Error handling event {message_id}: {exc}", exc_info=True)
+
+        if handled:
+            await self.redis_client.xack(settings.EVENTS_STREAM, settings.EVENTS_CONSUMER_GROUP, *handled)
+        EVENTS_PROCESSED.labels("handled").inc(len(handled))
+        EVENTS_PROCESSED.labels("failed").inc(len(events) - len(handled))
+        BATCH_SIZE.observe(len(events))
+        BATCH_DURATION.observe(time.perf_counter() - started)
+
+    async def reclaim_pending(self):
+        """Retry entries other consumers left unacknowledged for too long"""
+        pending = await self.redis_client.xpending_range(
+            settings.EVENTS_STREAM,
+            settings.EVENTS_CONSUMER_GROUP,
+            min="-",
+            max="+",
+            count=settings.EVENTS_READ_COUNT,
+            idle=settings.EVENTS_CLAIM_IDLE_MS
+        )
+        if not pending:
+            return
+
+        retry_ids = []
+        for entry in pending:
+            if entry["times_delivered"] >= settings.EVENTS_MAX_DELIVERIES:
+                entries = await self.redis_client.xrange(
+                    settings.EVENTS_STREAM, entry["message_id"], entry["message_id"]
+                )
+                fields = entries[0][1] if entries else {}
+                await self.dead_letter(
+                    entry["message_id"], fields, f"delivered {entry['times_delivered']} times"
+                )
+            else:
+                retry_ids.append(entry["message_id"])
+
+        if retry_ids:
+            # XCLAIM only takes entries that are still idle, so two replicas
+            # reclaiming at once do not both get them
+            claimed = await self.redis_client.xclaim(
+                settings.EVENTS_STREAM,
+                settings.EVENTS_CONSUMER_GROUP,
+                self.consumer_name,
+                settings.EVENTS_CLAIM_IDLE_MS,
+                retry_ids
+            )
+            claimed = [(message_id, fields) for message_id, fields in claimed if fields]
+            if claimed:
+                logger.warning(f"Retrying {len(claimed)} pending events")
+                await self.process_messages(claimed)
+
+    async def dead_letter(self, message_id: str, fields: dict, reason: str):
+        """Move an entry to the dead-letter stream and acknowledge it"""
+        await self.redis_client.xadd(
+            settings.EVENTS_DEAD_LETTER_STREAM,
+            {**fields, "original_id": message_id, "reason": reason},
+            maxlen=settings.EVENTS_STREAM_MAXLEN,
+            approximate=True
+        )
+        await self.redis_client.xack(settings.EVENTS_STREAM, settings.EVENTS_CONSUMER_GROUP, message_id)
+        EVENTS_PROCESSED.labels("dead_lettered").inc()
+        logger.warning(f"Moved event {message_id} to {settings.EVENTS_DEAD_LETTER_STREAM}: {reason}")
+
+    def apply_events(self, events: List[dict]) -> Dict[int, int]:
+        """Apply XP from a batch of events in one transaction (blocking)"""
+        awards = []
+        for event_data in events:
+            event_type = event_data.get('type')
+            field = XP_EVENT_FIELDS.get(event_type)
+            if field is None:
+                continue
+            data = event_data.get('data', {})
+            amount = data.get(field, 0)
+            if amount > 0:
+                # The event id doubles as the ledger idempotency key, so a
+                # redelivered event or its HTTP fallback is awarded once
+                key = event_data.get('event_id') or data.get('idempotency_key')
+                awards.append((event_data.get('user_id'), amount, event_type, key))
+        if not awards:
+            return {}
+
+        db = SessionLocal()
+        try:
+            totals = XPLedgerService.record_many(db, awards)
+        except Exception:
             db.rollback()
+            raise
         finally:
             db.close()
+        logger.info(f"Applied {len(awards)} XP events for {len(totals)} users")
+        return totals
+
+    def _invalidate(self, totals: Dict[int, int]):
+        for user_id in totals:
+            profile_cache.invalidate(user_id)
+
+    async def handle_event(self, event_data: dict):
+        """Handle a single event; raises if it should be retried"""
+        logger.info(f"Received event: {event_data.get('type')} for user {event_data.get('user_id')}")
+        totals = await asyncio.to_thread(self.apply_events, [event_data])
+        self._invalidate(totals)
 
     async def start(self):
         """Start the event listener"""
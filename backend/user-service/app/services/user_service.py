@@ -1,8 +1,28 @@
+from sqlalchemy import Integer, any_, bindparam, column, func, select, update, values
+from sqlalchemy.dialects.postgresql import ARRAY
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from decimal import Decimal
+from typing import Dict, List, Optional
+from app.core.profile_cache import profile_cache
 from app.models.user import User
-from app.schemas.user import UserUpdate, BalanceUpdate, XPUpdate
+from app.models.xp_ledger import XPLedgerEntry
+from app.schemas.user import UserUpdate, BalanceUpdate, UserResponse
+
+# Visible to any signed-in user; the rest only on the caller's own record
+# or to admin-service
+PUBLIC_USER_FIELDS = ("id", "username", "level", "xp")
+ALL_USER_FIELDS = ("id", "email", "username", "level", "xp", "balance", "created_at")
+
+
+def _pending_xp_column():
+    """Ledger XP not yet folded into users.xp, correlated to the User row"""
+    return (
+        select(func.coalesce(func.sum(XPLedgerEntry.amount), 0))
+        .where(XPLedgerEntry.user_id == User.id, ~XPLedgerEntry.folded)
+        .correlate(User)
+        .scalar_subquery()
+    )
 
 
 class UserService:
@@ -18,6 +38,87 @@ class UserService:
             )
         return user
 
+    @staticmethod
+    def effective_xp(xp: int, level: int, pending: int) -> tuple[int, int]:
+        """Folded xp/level plus the unfolded tail; the level never goes down"""
+        if not pending:
+            return xp, level
+        xp += pending
+        return xp, max(level, xp // UserService.XP_PER_LEVEL + 1)
+
+    @staticmethod
+    def to_response(db: Session, user: User) -> UserResponse:
+        """Serialize a user with ledger XP that is still waiting to be folded.
+
+        xp, level and the unfolded tail are re-read in one statement: read
+        separately, a fold committing in between would leave the award in
+        neither of them.
+        """
+        xp, level, pending = db.execute(
+            select(User.xp, User.level, _pending_xp_column()).where(User.id == user.id)
+        ).one()
+        response = UserResponse.model_validate(user)
+        response.xp, response.level = UserService.effective_xp(xp, level, pending)
+        return response
+
+    @staticmethod
+    def get_profile(db: Session, user_id: int) -> UserResponse:
+        """Profile read model, served from the in-process cache when possible"""
+        profile = profile_cache.get(user_id)
+        if profile is None:
+            version = profile_cache.version(user_id)
+            profile = UserService.to_response(db, UserService.get_user_by_id(db, user_id))
+            profile_cache.set(user_id, profile, version)
+        return profile
+
+    @staticmethod
+    def get_users_by_ids(
+        db: Session,
+        user_ids: List[int],
+        fields: Optional[List[str]] = None,
+        requester_id: Optional[int] = None,
+        admin: bool = False
+    ) -> tuple[list[dict], list[int]]:
+        """Fetch many users in one query, returned in the order requested.
+
+        The ids travel as a single array parameter (id = ANY(:ids)), so the
+        statement is the same whatever the batch size and uses the primary key
+        index. Only the requested columns are selected.
+
+        Admin callers may project every field. Anyone else gets the public
+        fields by default and a 403 for private ones unless the batch holds
+        only their own id.
+        """
+        user_ids = list(dict.fromkeys(user_ids))
+        fields = list(dict.fromkeys(fields or (ALL_USER_FIELDS if admin else PUBLIC_USER_FIELDS)))
+        private = [name for name in fields if name not in PUBLIC_USER_FIELDS]
+        if private and not admin and any(user_id != requester_id for user_id in user_ids):
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Fields {', '.join(private)} are only available for your own record"
+            )
+
+        columns = [getattr(User, name) for name in dict.fromkeys(["id", *fields])]
+        with_xp = "xp" in fields or "level" in fields
+        if with_xp:
+            columns += [User.xp, User.level, _pending_xp_column().label("pending_xp")]
+
+        rows = db.execute(
+            select(*columns).where(
+                User.id == any_(bindparam("ids", user_ids, type_=ARRAY(Integer)))
+            )
+        ).mappings().all()
+        by_id = {}
+        for row in rows:
+            row = dict(row)
+            if with_xp:
+                row["xp"], row["level"] = UserService.effective_xp(row["xp"], row["level"], row.pop("pending_xp"))
+            by_id[row["id"]] = {name: row[name] for name in fields}
+
+        users = [by_id[user_id] for user_id in user_ids if user_id in by_id]
+        missing = [user_id for user_id in user_ids if user_id not in by_id]
+        return users, missing
+
     @staticmethod
     def update_user(db: Session, user_id: int, user_update: UserUpdate) -> User:
         user = UserService.get_user_by_id(db, user_id)
@@ -35,39 +136,79 @@ class UserService:
             user.username = user_update.username
 
         db.commit()
+        profile_cache.invalidate(user_id)
         db.refresh(user)
         return user
 
+    @staticmethod
+    def _raise_update_failed(db: Session, user_id: int, detail: str):
+        """A guarded UPDATE matched no row: tell a missing user from a failed guard"""
+        db.rollback()
+        UserService.get_user_by_id(db, user_id)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=detail
+        )
+
     @staticmethod
     def update_balance(db: Session, user_id: int, balance_update: BalanceUpdate) -> User:
-        user = UserService.get_user_by_id(db, user_id)
-        new_balance = user.balance + balance_update.amount
+        """Apply a balance delta in one statement.
 
-        if new_balance < 0:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Insufficient balance"
-            )
+        The new value is computed by the database and the overdraft check is
+        part of the WHERE clause, so concurrent deposits and withdrawals can
+        neither lose an update nor push the balance below zero.
+        """
+        amount = balance_update.amount
+        user = db.execute(
+            update(User)
+            .where(User.id == user_id, User.balance + amount >= 0)
+            .values(balance=User.balance + amount)
+            .returning(User)
+            .execution_options(synchronize_session=False, populate_existing=True)
+        ).scalar_one_or_none()
+
+        if user is None:
+            UserService._raise_update_failed(db, user_id, "Insufficient balance")
 
-        user.balance = new_balance
+        # RETURNING already loaded the row; keep commit from expiring it
+        db.expunge(user)
         db.commit()
-        db.refresh(user)
+        profile_cache.invalidate(user_id)
         return user
 
     @staticmethod
-    def add_xp(db: Session, user_id: int, xp_update: XPUpdate) -> User:
-        user = UserService.get_user_by_id(db, user_id)
-        user.xp += xp_update.xp
-
-        old_level = user.level
-        new_level = user.xp // UserService.XP_PER_LEVEL + 1
-
-        if new_level > old_level:
-            user.level = new_level
+    def apply_xp(db: Session, totals: Dict[int, int]):
+        """Add XP to several users and recompute their levels in one statement.
 
-        db.commit()
-        db.refresh(user)
-        return user
+        Takes {user_id: xp_delta} and issues a single UPDATE ... FROM (VALUES
+        ...). SET expressions see each row as it was before the update, so the
+        level comes from the old xp plus the delta and never goes down. The
+        caller commits, which releases the row locks.
+        """
+        if not totals:
+            return
+        # Lock the rows in id order first: the UPDATE itself visits them in
+        # whatever order the join produces, so two concurrent folds or a fold
+        # and an event batch could otherwise deadlock on each other
+        db.execute(
+            select(User.id)
+            .where(User.id.in_(sorted(totals)))
+            .order_by(User.id)
+            .with_for_update()
+        )
+        deltas = values(
+            column("user_id", Integer), column("xp", Integer), name="deltas"
+        ).data(sorted(totals.items()))
+        new_xp = User.xp + deltas.c.xp
+        db.execute(
+            update(User)
+            .where(User.id == deltas.c.user_id)
+            .values(
+                xp=new_xp,
+                level=func.greatest(User.level, new_xp // UserService.XP_PER_LEVEL + 1)
+            )
+            .execution_options(synchronize_session=False)
+        )
 
     @staticmethod
     def calculate_level_info(xp: int) -> dict:
@@ -0,0 +1,191 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set, Tuple
+from sqlalchemy import select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.profile_cache import profile_cache
+from app.models.xp_ledger import XPLedgerEntry
+from app.services.user_service import UserService
+
+logger = logging.getLogger(__name__)
+
+
+def _sum_by_user(entries) -> Dict[int, int]:
+    totals: Dict[int, int] = {}
+    for user_id, amount in entries:
+        totals[user_id] = totals.get(user_id, 0) + amount
+    return totals
+
+
+class XPLedgerService:
+    @staticmethod
+    def record(
+        db: Session,
+        user_id: int,
+        amount: int,
+        source: str,
+        idempotency_key: Optional[str] = None
+    ) -> bool:
+        """Append an XP award; False if the key was already recorded for the user"""
+        stmt = (
+            insert(XPLedgerEntry)
+            .values(user_id=user_id, amount=amount, source=source, idempotency_key=idempotency_key)
+            .on_conflict_do_nothing(constraint="uq_xp_ledger_user_key")
+            .returning(XPLedgerEntry.id)
+        )
+        try:
+            entry_id = db.execute(stmt).scalar_one_or_none()
+            db.commit()
+        except IntegrityError:
+            # Only the users foreign key is left to fail
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found"
+            )
+        if entry_id is None:
+            logger.info(f"Skipped duplicate XP award {idempotency_key} for user {user_id}")
+            return False
+        profile_cache.invalidate(user_id)
+        return True
+
+    @staticmethod
+    def record_many(db: Session, awards: List[Tuple[int, int, str, Optional[str]]]) -> Dict[int, int]:
+        """Record a batch of (user_id, amount, source, idempotency_key) awards
+        and apply them to users in the same transaction.
+
+        Entries are inserted already folded with one multi-row INSERT; the
+        ones that were not duplicates are summed per user and added with
+        UserService.apply_xp. Returns the XP added per user.
+        """
+        if not awards:
+            return {}
+        inserted = db.execute(
+            insert(XPLedgerEntry)
+            .values([
+                {"user_id": user_id, "amount": amount, "source": source,
+                 "idempotency_key": idempotency_key, "folded": True}
+                for user_id, amount, source, idempotency_key in awards
+            ])
+            .on_conflict_do_nothing(constraint="uq_xp_ledger_user_key")
+            .returning(XPLedgerEntry.user_id, XPLedgerEntry.amount)
+        ).all()
+
+        totals = _sum_by_user(inserted)
+        UserService.apply_xp(db, totals)
+        db.commit()
+        return totals
+
+    @staticmethod
+    def fold(db: Session, batch_size: int) -> Tuple[int, Dict[int, int]]:
+        """Fold up to batch_size ledger entries into users.xp/level.
+
+        Claims the oldest unfolded entries (skipping rows another replica is
+        folding), marks them folded and applies the per-user totals in the
+        same transaction, so an entry is never folded twice or lost. Returns
+        the number of entries folded and the XP added per user.
+        """
+        batch = (
+            select(XPLedgerEntry.id)
+            .where(~XPLedgerEntry.folded)
+            .order_by(XPLedgerEntry.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        marked = db.execute(
+            update(XPLedgerEntry)
+            .where(XPLedgerEntry.id.in_(batch))
+            .values(folded=True)
+            .returning(XPLedgerEntry.user_id, XPLedgerEntry.amount)
+            .execution_options(synchronize_session=False)
+        ).all()
+        totals = _sum_by_user(marked)
+        UserService.apply_xp(db, totals)
+        db.commit()
+        return len(marked), totals
+
+
+class XPAggregator:
+    """Background task that periodically folds the XP ledger into users.
+
+    Each award is one cheap INSERT; the contended users rows are updated once
+    per user per batch instead of once per award.
+    """
+
+    def __init__(self):
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+
+    def _fold_pending(self, user_ids: Set[int]) -> int:
+        """Fold until the ledger is drained, adding the users touched to user_ids"""
+        total = 0
+        db = SessionLocal()
+        try:
+            while True:
+                folded, totals = XPLedgerService.fold(db, settings.XP_LEDGER_FOLD_BATCH)
+                user_ids.update(totals)
+                total += folded
+                if folded < settings.XP_LEDGER_FOLD_BATCH:
+                    return total
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    @staticmethod
+    def _invalidate(user_ids: Set[int]):
+        for user_id in user_ids:
+            profile_cache.invalidate(user_id)
+
+    async def fold_pending(self) -> int:
+        """Fold in a worker thread, then drop the folded users' cached profiles"""
+        user_ids: Set[int] = set()
+        try:
+            folded = await asyncio.to_thread(self._fold_pending, user_ids)
+        except Exception:
+            # Batches committed before the failure changed these users too
+            self._invalidate(user_ids)
+            raise
+        self._invalidate(user_ids)
+        return folded
+
+    async def run(self):
+        while self.running:
+            try:
+                folded = await self.fold_pending()
+                if folded:
+                    logger.info(f"Folded {folded} XP ledger entries")
+            except Exception as e:
+                logger.error(f"XP ledger fold failed: {e}", exc_info=True)
+            await asyncio.sleep(settings.XP_LEDGER_FOLD_INTERVAL)
+
+    def start(self):
+        """Start the aggregator"""
+        self.running = True
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        """Stop the aggregator and fold whatever is left"""
+        self.running = False
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        try:
+            await self.fold_pending()
+        except Exception as e:
+            logger.error(f"Final XP ledger fold failed: {e}")
+
+
+# Global XP aggregator instance
+xp_aggregator = XPAggregator()
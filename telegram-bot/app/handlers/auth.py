@@ -382,7 +382,7 @@ async def cmd_link(message: Message, state: FSMContext) -> None:
 @router.message(Command("logout"))
 async def cmd_logout(message: Message, state: FSMContext) -> None:
     """
-    Простой logout: токены в БД обнуляются.
+    Logout: токены отзываются в auth-service и обнуляются в БД.
     """
     from sqlalchemy import select
     from app.services.database import AsyncSessionLocal
@@ -397,6 +397,13 @@ async def cmd_logout(message: Message, state: FSMContext) -> None:
             await message.answer("Ты ещё не вошёл в аккаунт.")
             return
 
+        if tg_session.access_token:
+            # Отзываем токены на сервере, чтобы их нельзя было использовать повторно
+            try:
+                await APIClient(access_token=tg_session.access_token).logout(tg_session.refresh_token)
+            except Exception as exc:
+                logger.warning("Logout request failed: %s", exc)
+
         tg_session.access_token = None
         tg_session.refresh_token = None
         await session.commit()
@@ -58,8 +58,7 @@ async def cmd_balance(message: Message) -> None:
         return
 
     try:
-        profile: Dict[str, Any] = await client.get_user_profile()
-        level_info: Dict[str, Any] = await client.get_level_info()
+        profile, level_info = await client.get_profile_and_level()
     except HTTPStatusError as exc:
         status = exc.response.status_code if exc.response is not None else None
         logger.warning("Balance request failed: %s", exc)
@@ -1,5 +1,5 @@
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
 from sqlalchemy import select
@@ -20,7 +20,12 @@ class APIClient:
     Режим определяется через переменную окружения API_GATEWAY_URL.
     """
 
-    def __init__(self, base_url: Optional[str] = None, access_token: Optional[str] = None):
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        access_token: Optional[str] = None,
+        refresh_token: Optional[str] = None,
+    ):
         # Определяем URL API Gateway:
         # 1. Если передан явно - используем его
         # 2. Если задана переменная окружения - используем её
@@ -28,6 +33,7 @@ class APIClient:
         default_url = os.getenv("API_GATEWAY_URL", "https://api.finteen.clv-digital.tech")
         self.base_url = base_url or default_url
         self.access_token = access_token
+        self.refresh_token = refresh_token
 
     def _get_headers(self) -> Dict[str, str]:
         headers: Dict[str, str] = {"Content-Type": "application/json"}
@@ -50,20 +56,33 @@ class APIClient:
         data = {"email": email, "username": username, "password": password}
         result = await self._request("POST", "/api/v1/auth/register", json=data)
         self.access_token = result.get("access_token")
+        self.refresh_token = result.get("refresh_token")
         return result
 
     async def login(self, email: str, password: str) -> Dict[str, Any]:
         data = {"email": email, "password": password}
         result = await self._request("POST", "/api/v1/auth/login", json=data)
         self.access_token = result.get("access_token")
+        self.refresh_token = result.get("refresh_token")
         return result
 
-    async def refresh(self, refresh_token: str) -> Dict[str, Any]:
-        data = {"refresh_token": refresh_token}
+    async def refresh(self, refresh_token: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Обновление токенов. Refresh-токен одноразовый: в ответе приходит новый,
+        он заменяет старый в self.refresh_token, и сохранять нужно именно его
+        (повторное использование старого завершает сессию).
+        """
+        data = {"refresh_token": refresh_token or self.refresh_token}
         result = await self._request("POST", "/api/v1/auth/refresh", json=data)
         self.access_token = result.get("access_token")
+        self.refresh_token = result.get("refresh_token")
         return result
 
+    async def logout(self, refresh_token: Optional[str] = None) -> None:
+        """Отзыв текущего access-токена (и refresh-токена, если передан)."""
+        data = {"refresh_token": refresh_token} if refresh_token else None
+        await self._request("POST", "/api/v1/auth/logout", json=data)
+
     # ---------- User / Profile ----------
 
     async def get_user_profile(self) -> Dict[str, Any]:
@@ -72,6 +91,11 @@ class APIClient:
     async def get_level_info(self) -> Dict[str, Any]:
         return await self._request("GET", "/api/v1/users/me/level")
 
+    async def get_profile_and_level(self) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Профиль и уровень за один запрос к user-service."""
+        summary = await self._request("GET", "/api/v1/users/me/summary")
+        return summary["profile"], summary["level"]
+
     # ---------- Finance ----------
 
     async def get_transactions(self, page: int = 1, page_size: int = 10) -> Dict[str, Any]:
@@ -154,7 +178,7 @@ async def get_api_client_for_telegram_user(telegram_user_id: int) -> Optional[AP
         tg_session.last_activity = tg_session.last_activity  # триггер onupdate
         await session.commit()
 
-        return APIClient(access_token=tg_session.access_token)
+        return APIClient(access_token=tg_session.access_token, refresh_token=tg_session.refresh_token)
 
 
 async def save_tokens_for_telegram_user(